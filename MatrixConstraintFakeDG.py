@@ -0,0 +1,1581 @@
+'''
+    File name: MatrixConstraintFakeDG.py
+    Python Version: 2.7
+    In-process stand-in for the part of Maya MatrixConstraint uses, so the builder can run, be checked and be
+    benchmarked on a machine without Maya. install() registers fake maya.cmds, maya.api.OpenMaya and
+    maya.api.OpenMayaAnim modules backed by one FakeDG. The FakeDG keeps nodes, attributes and connections in
+    dictionaries, records every edit in an undo journal and evaluates transform, wtAddMatrix, blendMatrix, choice,
+    multMatrix, decomposeMatrix, pickMatrix and animation curve nodes numerically.
+
+        from MatrixConstraint import MatrixConstraintFakeDG
+        dg = MatrixConstraintFakeDG.install()
+        from MatrixConstraint.MatrixConstraint import matrixConstraint
+        cone, cube = dg.createNode('transform', n='cone'), dg.createNode('transform', n='cube')
+        dg.setAttr('cone.translate', 1, 2, 3)
+        matrixConstraint([cone, cube], parent=True, all=True)
+        dg.getAttr('cube.translate')
+
+    Values are kept in UI units, centimeters and degrees. Rotations follow the transform's rotateOrder, joint
+    orients, pivots and shear on transforms are not modelled, and blendMatrix is evaluated as a linear matrix blend
+    where Maya interpolates rotations. Animation curves interpolate linearly between keys, or hold for step tangents.
+    Modifiers, MAnimCurveChange and plugin commands behave like Maya's for undo: a modifier's edits only reach the
+    undo queue through a command such as matrixConstraintUndo, and curve edits made without an MAnimCurveChange are
+    not undoable at all.
+'''
+
+import fnmatch
+import os
+import sys
+import types
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+
+from MatrixConstraint.MatrixEvaluator import composeMatrices, decomposeMatrices, eulerFromRotation
+
+_IDENTITY = tuple(np.identity(4).ravel().tolist())
+_XYZ = 'XYZ'
+_ROTATE_ORDERS = ('xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx')
+# Compound attributes with X/Y/Z children
+_COMPOUNDS = ('translate', 'rotate', 'scale', 'outputTranslate', 'outputRotate', 'outputScale', 'outputShear')
+_ALIASES = {'v': 'visibility', 't': 'translate', 'r': 'rotate', 's': 'scale', 'ro': 'rotateOrder',
+            'tx': 'translateX', 'ty': 'translateY', 'tz': 'translateZ',
+            'rx': 'rotateX', 'ry': 'rotateY', 'rz': 'rotateZ',
+            'sx': 'scaleX', 'sy': 'scaleY', 'sz': 'scaleZ',
+            'm': 'matrix', 'wm': 'worldMatrix', 'pim': 'parentInverseMatrix', 'opm': 'offsetParentMatrix'}
+# Static attributes of each node type with their defaults. Outputs default to None and are computed on read, multi
+# attributes hold the default of an element, compound multis a dict of child defaults
+_SCHEMAS = {
+    'transform': {'visibility': True, 'translate': (0.0, 0.0, 0.0), 'rotate': (0.0, 0.0, 0.0),
+                  'scale': (1.0, 1.0, 1.0), 'rotateOrder': 0, 'offsetParentMatrix': _IDENTITY, 'matrix': None,
+                  'worldMatrix': None, 'parentInverseMatrix': None},
+    'multMatrix': {'matrixIn': _IDENTITY, 'matrixSum': None},
+    'wtAddMatrix': {'wtMatrix': {'matrixIn': _IDENTITY, 'weightIn': 0.0}, 'matrixSum': None},
+    'blendMatrix': {'inputMatrix': _IDENTITY, 'envelope': 1.0,
+                    'target': {'targetMatrix': _IDENTITY, 'weight': 1.0}, 'outputMatrix': None},
+    'choice': {'selector': 0, 'input': _IDENTITY, 'output': None},
+    'decomposeMatrix': {'inputMatrix': _IDENTITY, 'inputRotateOrder': 0, 'outputTranslate': None,
+                        'outputRotate': None, 'outputScale': None, 'outputShear': None},
+    'pickMatrix': {'inputMatrix': _IDENTITY, 'useTranslate': True, 'useRotate': True, 'useScale': True,
+                   'useShear': True, 'outputMatrix': None},
+    'animCurveTL': {'output': None},
+    'animCurveTA': {'output': None},
+    'animCurveTU': {'output': None},
+}
+_MULTIS = ('matrixIn', 'wtMatrix', 'target', 'input', 'worldMatrix', 'parentInverseMatrix')
+# MFnAnimCurve tangent type whose keys hold their value until the next key
+_TANGENT_STEP = 5
+
+
+def _parsePart(part):
+    '''('name', index or None) of one plug path part such as 'wtMatrix[2]\''''
+    name, _, index = part.rstrip(']').partition('[')
+    return _ALIASES.get(name, name), int(index) if index else None
+
+
+def _rotation(degrees, order='xyz'):
+    '''Row vector rotation matrix of euler angles in degrees, the first axis of order is applied first'''
+    radians = dict(zip('xyz', np.radians(degrees)))
+    rotation = np.identity(3)
+    for axis in order:
+        c, s = np.cos(radians[axis]), np.sin(radians[axis])
+        i, j = [(1, 2), (2, 0), (0, 1)]['xyz'.index(axis)]
+        single = np.identity(3)
+        single[i, i], single[i, j], single[j, i], single[j, j] = c, s, -s, c
+        rotation = np.matmul(rotation, single)
+    return rotation
+
+
+def _compose(translate=(0.0, 0.0, 0.0), rotate=(0.0, 0.0, 0.0), scale=(1.0, 1.0, 1.0), shear=(0.0, 0.0, 0.0),
+             order='xyz'):
+    '''Matrix of scale * shear * rotate * translate, the inverse of MatrixEvaluator.decomposeMatrices'''
+    shearMatrix = np.identity(3)
+    shearMatrix[1, 0], shearMatrix[2, 0], shearMatrix[2, 1] = shear
+    matrix = np.identity(4)
+    matrix[:3, :3] = np.matmul(np.matmul(np.diag(scale), shearMatrix), _rotation(rotate, order))
+    matrix[3, :3] = translate
+    return matrix
+
+
+def _asMatrix(values):
+    return np.asarray(values, dtype=np.float64).reshape(4, 4)
+
+
+class _Node(object):
+    __slots__ = ('name', 'nodeType', 'parent', 'dynamic', 'locked', 'keys')
+
+    def __init__(self, name, nodeType, parent=None):
+        self.name = name
+        self.nodeType = nodeType
+        self.parent = parent
+        # Dynamic attributes, name to (default, multi)
+        self.dynamic = {}
+        self.locked = set()
+        # (time, value, inTangent, outTangent) of an animation curve, values in internal units
+        self.keys = ()
+
+
+def _command(func):
+    '''Makes a cmds call one undo item unless it runs inside an open chunk'''
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if self._depth or self._captures:
+            return func(self, *args, **kwargs)
+        self.undoInfo(openChunk=True, chunkName=func.__name__)
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self.undoInfo(closeChunk=True)
+    return wrapper
+
+
+class FakeDG(object):
+    '''
+    Scene state and the maya.cmds subset MatrixConstraint calls, with Maya's names and flags. install() exposes the
+    methods as the fake maya.cmds module.
+    '''
+
+    def __init__(self):
+        # Callbacks, loaded plugins and their commands outlive a new scene
+        self._callbacks = {}
+        self._plugins = set()
+        self._commands = {}
+        self.module = None
+        self.reset()
+
+    def reset(self):
+        '''Empties the scene and the undo queue, like a new scene'''
+        self._nodes = {}
+        self._values = {}
+        self._sources = {}
+        self._selection = []
+        self._undoStack = []
+        self._captures = []
+        self._depth = 0
+        self._recording = True
+        self._evaluationMode = 'parallel'
+        self._time = 1.0
+        self._notify('kAfterNew')
+
+    # Journal
+
+    def _record(self, inverse):
+        if self._captures:
+            self._captures[-1].append(inverse)
+        elif self._recording and self._depth:
+            self._undoStack[-1][1].append(inverse)
+
+    @contextmanager
+    def _capturing(self, inverses):
+        '''Sends the inverses of the edits made inside the block to inverses instead of the undo queue'''
+        self._captures.append(inverses)
+        try:
+            yield inverses
+        finally:
+            self._captures.pop()
+
+    @staticmethod
+    def _replay(inverses):
+        for inverse in reversed(inverses):
+            inverse()
+
+    def undoInfo(self, openChunk=False, closeChunk=False, chunkName='', query=False, undoName=False, state=None,
+                 stateWithoutFlush=None):
+        if query:
+            if undoName:
+                return self._undoStack[-1][0] if self._undoStack else ''
+            return self._recording
+        if state is not None or stateWithoutFlush is not None:
+            self._recording = bool(state if state is not None else stateWithoutFlush)
+            if state is False:
+                self._undoStack = []
+        if openChunk:
+            if not self._depth:
+                self._undoStack.append((chunkName, []))
+            self._depth += 1
+        if closeChunk and self._depth:
+            self._depth -= 1
+            if not self._depth and self._undoStack and not self._undoStack[-1][1]:
+                self._undoStack.pop()
+
+    def undo(self):
+        if not self._undoStack:
+            raise RuntimeError("There are no more commands to undo.")
+        name, inverses = self._undoStack.pop()
+        recording, self._recording = self._recording, False
+        try:
+            for inverse in reversed(inverses):
+                inverse()
+        finally:
+            self._recording = recording
+
+    # Callbacks, the fake OpenMaya message classes register them by kind: 'connection' gets (source, destination,
+    # made), 'nodeRemoved' and 'parentAdded' the node, scene messages nothing
+
+    def _addCallback(self, kind, callback):
+        callbackId = max(self._callbacks or [0]) + 1
+        self._callbacks[callbackId] = (kind, callback)
+        return callbackId
+
+    def _removeCallback(self, callbackId):
+        self._callbacks.pop(callbackId, None)
+
+    def _notify(self, kind, *args):
+        for callbackKind, callback in list(self._callbacks.values()):
+            if callbackKind == kind:
+                callback(*args)
+
+    # Plugins
+
+    def _registerCommand(self, name, creator):
+        self._commands[name] = creator
+        if self.module is not None:
+            setattr(self.module, name, lambda *args: self._runCommand(name, creator))
+
+    def _deregisterCommand(self, name):
+        self._commands.pop(name, None)
+        if self.module is not None and hasattr(self.module, name):
+            delattr(self.module, name)
+
+    def _runCommand(self, name, creator):
+        '''Runs an MPxCommand, an undoable one becomes a single undo item calling its undoIt'''
+        command = creator()
+        self.undoInfo(openChunk=True, chunkName=name)
+        try:
+            inverses = []
+            with self._capturing(inverses):
+                command.doIt(None)
+            if command.isUndoable():
+                self._record(lambda: (self._replay(inverses), command.undoIt()))
+        finally:
+            self.undoInfo(closeChunk=True)
+
+    # Primitive edits, each records its own inverse and the raw edits run by undo notify the callbacks
+
+    def _setValue(self, plug, value):
+        previous = self._values.get(plug, _MISSING)
+        self._values[plug] = value
+        self._record(lambda: self._restoreValue(plug, previous))
+
+    def _restoreValue(self, plug, previous):
+        if previous is _MISSING:
+            self._values.pop(plug, None)
+        else:
+            self._values[plug] = previous
+
+    def _link(self, source, destination):
+        self._sources[destination] = source
+        self._notify('connection', source, destination, True)
+
+    def _unlink(self, destination):
+        source = self._sources.pop(destination)
+        self._notify('connection', source, destination, False)
+        return source
+
+    def _insert(self, node):
+        self._nodes[node.name] = node
+        if node.parent:
+            self._notify('parentAdded', node)
+
+    def _erase(self, name):
+        node = self._nodes.pop(name)
+        self._notify('nodeRemoved', node)
+        return node
+
+    def _rekey(self, old, new):
+        node = self._nodes.pop(old)
+        node.name = new
+        self._nodes[new] = node
+
+    def _connect(self, source, destination):
+        self._link(source, destination)
+        self._record(lambda: self._unlink(destination))
+
+    def _disconnect(self, destination):
+        source = self._unlink(destination)
+        self._record(lambda: self._link(source, destination))
+
+    def _addNode(self, node):
+        self._insert(node)
+        self._record(lambda: self._erase(node.name))
+
+    def _removeNode(self, name):
+        node = self._erase(name)
+        self._record(lambda: self._insert(node))
+
+    def _renameNode(self, old, new):
+        self._rekey(old, new)
+        self._record(lambda: self._rekey(new, old))
+
+    def _setField(self, obj, field, value):
+        previous = getattr(obj, field)
+        setattr(obj, field, value)
+        self._record(lambda: setattr(obj, field, previous))
+
+    # Names and plugs
+
+    def _resolve(self, name):
+        '''Stored name of a node given by name, long DAG path or PyNode. Node names are kept unique'''
+        short = str(name).split('|')[-1]
+        if short not in self._nodes:
+            raise ValueError("No object matches name: %s" % name)
+        return short
+
+    def _longName(self, name):
+        node = self._nodes[name]
+        if node.nodeType != 'transform':
+            return name
+        path = []
+        while node is not None:
+            path.append(node.name)
+            node = self._nodes[node.parent] if node.parent else None
+        return '|' + '|'.join(reversed(path))
+
+    def _plug(self, plug, node=None):
+        '''Canonical 'node.attr[index].child' name with long attribute names'''
+        if node is not None:
+            nodeName, attr = self._resolve(node), plug
+        else:
+            nodeName, _, attr = str(plug).partition('.')
+            nodeName = self._resolve(nodeName)
+        parts = []
+        for part in attr.split('.'):
+            name, index = _parsePart(part)
+            parts.append(name if index is None else '%s[%d]' % (name, index))
+        return nodeName + '.' + '.'.join(parts)
+
+    def _attrDefault(self, plug):
+        '''(exists, default) for a canonical plug'''
+        nodeName, _, attr = plug.partition('.')
+        return self._nodeAttrDefault(self._nodes[nodeName], attr)
+
+    @staticmethod
+    def _nodeAttrDefault(node, attr):
+        '''(exists, default) for an attribute path of a node, which need not be in the scene yet'''
+        parts = [_parsePart(part) for part in attr.split('.')]
+        name = parts[0][0]
+        if name == 'message':
+            return True, None
+        if name in node.dynamic:
+            return True, node.dynamic[name][0]
+        schema = _SCHEMAS.get(node.nodeType, {})
+        if name in schema:
+            default = schema[name]
+            if isinstance(default, dict):
+                if len(parts) == 1:
+                    return True, None
+                return parts[1][0] in default, default.get(parts[1][0])
+            return True, default
+        if name[:-1] in _COMPOUNDS and name[-1] in _XYZ and name[:-1] in schema:
+            default = schema[name[:-1]]
+            return True, None if default is None else default[_XYZ.index(name[-1])]
+        return False, None
+
+    def _related(self, plug):
+        '''The plug, its compound parent and its children, the plugs a connection to plug conflicts with'''
+        related = [plug]
+        if plug[-1] in _XYZ and plug[:-1].rpartition('.')[2] in _COMPOUNDS:
+            related.append(plug[:-1])
+        if plug.rpartition('.')[2] in _COMPOUNDS:
+            related += [plug + axis for axis in _XYZ]
+        return related
+
+    # Evaluation
+
+    def _read(self, plug):
+        '''Evaluated value of a canonical plug, following connections'''
+        source = self._sources.get(plug)
+        if source is not None:
+            return self._read(source)
+        if plug[-1] in _XYZ and plug[:-1] in self._sources:
+            return self._read(plug[:-1])[_XYZ.index(plug[-1])]
+        if plug.rpartition('.')[2] in _COMPOUNDS and any(plug + axis in self._sources for axis in _XYZ):
+            return tuple(self._read(plug + axis) for axis in _XYZ)
+
+        nodeName, _, attr = plug.partition('.')
+        computed = self._compute(self._nodes[nodeName], attr)
+        if computed is not None:
+            return computed
+        if plug in self._values:
+            return self._values[plug]
+        # Compounds are stored per child
+        if plug.rpartition('.')[2] in _COMPOUNDS:
+            stored = [self._values.get(plug + axis) for axis in _XYZ]
+            if any(value is not None for value in stored):
+                default = self._attrDefault(plug)[1]
+                return tuple(default[i] if value is None else value for i, value in enumerate(stored))
+        exists, default = self._attrDefault(plug)
+        if not exists:
+            raise ValueError("No object matches name: %s" % plug)
+        return default
+
+    def _readMatrix(self, plug):
+        return _asMatrix(self._read(plug))
+
+    def _indices(self, plug):
+        '''Logical indices in use on a canonical multi plug'''
+        prefix = plug + '['
+        indices = set()
+        for key in list(self._values) + list(self._sources):
+            if key.startswith(prefix):
+                indices.add(int(key[len(prefix):].split(']')[0]))
+        return sorted(indices)
+
+    def _localMatrix(self, name):
+        node = name + '.'
+        order = _ROTATE_ORDERS[int(self._read(node + 'rotateOrder'))]
+        return _compose(self._read(node + 'translate'), self._read(node + 'rotate'), self._read(node + 'scale'),
+                        order=order)
+
+    def _worldMatrix(self, name):
+        '''matrix * offsetParentMatrix * parent world matrix'''
+        node = self._nodes[name]
+        world = np.matmul(self._localMatrix(name), self._readMatrix(name + '.offsetParentMatrix'))
+        if node.parent:
+            world = np.matmul(world, self._worldMatrix(node.parent))
+        return world
+
+    def _compute(self, node, attr):
+        '''Value of a computed output, None for anything that is not one'''
+        name = node.name + '.'
+        if node.nodeType == 'transform':
+            if attr == 'matrix':
+                return tuple(self._localMatrix(node.name).ravel())
+            if attr.startswith('worldMatrix'):
+                return tuple(self._worldMatrix(node.name).ravel())
+            if attr.startswith('parentInverseMatrix'):
+                parentWorld = self._worldMatrix(node.parent) if node.parent else np.identity(4)
+                return tuple(np.linalg.inv(parentWorld).ravel())
+        elif node.nodeType == 'multMatrix' and attr == 'matrixSum':
+            result = np.identity(4)
+            for index in self._indices(name + 'matrixIn'):
+                result = np.matmul(result, self._readMatrix('%smatrixIn[%d]' % (name, index)))
+            return tuple(result.ravel())
+        elif node.nodeType == 'wtAddMatrix' and attr == 'matrixSum':
+            result = np.zeros((4, 4))
+            for index in self._indices(name + 'wtMatrix'):
+                entry = '%swtMatrix[%d].' % (name, index)
+                result += self._read(entry + 'weightIn') * self._readMatrix(entry + 'matrixIn')
+            return tuple(result.ravel())
+        elif node.nodeType == 'blendMatrix' and attr == 'outputMatrix':
+            result = self._readMatrix(name + 'inputMatrix')
+            envelope = self._read(name + 'envelope')
+            for index in self._indices(name + 'target'):
+                entry = '%starget[%d].' % (name, index)
+                weight = self._read(entry + 'weight') * envelope
+                result = result * (1.0 - weight) + self._readMatrix(entry + 'targetMatrix') * weight
+            return tuple(result.ravel())
+        elif node.nodeType == 'choice' and attr == 'output':
+            # Only the selected input is read, a missing one passes identity
+            selected = '%sinput[%d]' % (name, int(self._read(name + 'selector')))
+            return self._read(selected) if selected in self._sources or selected in self._values else _IDENTITY
+        elif node.nodeType == 'decomposeMatrix' and attr.startswith('output'):
+            channel = attr[len('output'):]
+            decomposed = decomposeMatrices(self._readMatrix(name + 'inputMatrix'))
+            values = tuple(decomposed[channel.rstrip(_XYZ).lower()].tolist())
+            return values[_XYZ.index(channel[-1])] if channel[-1] in _XYZ else values
+        elif node.nodeType == 'pickMatrix' and attr == 'outputMatrix':
+            decomposed = decomposeMatrices(self._readMatrix(name + 'inputMatrix'))
+            parts = {}
+            for channel, flag in (('translate', 'useTranslate'), ('rotate', 'useRotate'), ('scale', 'useScale'),
+                                  ('shear', 'useShear')):
+                if self._read(name + flag):
+                    parts[channel] = decomposed[channel]
+            return tuple(_compose(**parts).ravel())
+        elif node.nodeType.startswith('animCurve') and attr == 'output':
+            return self._evaluateCurve(node)
+        return None
+
+    def _evaluateCurve(self, node):
+        '''Curve value at the current time in UI units, linear between keys and held after a step tangent'''
+        value = node.keys[0][1] if node.keys else 0.0
+        for i, (time, keyValue, _, _) in enumerate(node.keys):
+            if time > self._time:
+                if i:
+                    previous = node.keys[i - 1]
+                    if previous[3] == _TANGENT_STEP:
+                        value = previous[1]
+                    else:
+                        weight = (self._time - previous[0]) / (time - previous[0])
+                        value = previous[1] + (keyValue - previous[1]) * weight
+                break
+            value = keyValue
+        return float(np.degrees(value)) if node.nodeType == 'animCurveTA' else float(value)
+
+    # maya.cmds
+
+    def _uniqueName(self, base):
+        unique, count = base, 1
+        while unique in self._nodes:
+            unique = '%s%d' % (base.rstrip('0123456789'), count)
+            count += 1
+        return unique
+
+    @_command
+    def createNode(self, nodeType, n=None, name=None, p=None, parent=None, ss=False, skipSelect=False):
+        if nodeType not in _SCHEMAS:
+            raise RuntimeError("Unknown object type: %s" % nodeType)
+        unique = self._uniqueName(n or name or nodeType + '1')
+        parent = p or parent
+        self._addNode(_Node(unique, nodeType, self._resolve(parent) if parent else None))
+        if not (ss or skipSelect):
+            self.select(unique)
+        return unique
+
+    @_command
+    def rename(self, node, newName):
+        '''Renames a node, a '#' in newName is replaced by the first number that makes the name unique'''
+        old = self._resolve(node)
+        new, count = newName.replace('#', '1') if '#' in newName else newName, 1
+        while new in self._nodes and new != old:
+            count += 1
+            new = newName.replace('#', str(count)) if '#' in newName else '%s%d' % (newName, count - 1)
+        if new == old:
+            return new
+        moved = lambda plug: new + plug[len(old):] if plug.partition('.')[0] == old else plug
+        # Connections are dropped under the old name and made again under the new one
+        connections = [(source, destination) for destination, source in list(self._sources.items())
+                       if old in (destination.partition('.')[0], source.partition('.')[0])]
+        for _, destination in connections:
+            self._disconnect(destination)
+        self._renameNode(old, new)
+        for child in self._nodes.values():
+            if child.parent == old:
+                self._setField(child, 'parent', new)
+        for key in [key for key in self._values if key.partition('.')[0] == old]:
+            value = self._values[key]
+            self._setValue(key, None)
+            self._values.pop(key)
+            self._setValue(moved(key), value)
+        for source, destination in connections:
+            self._connect(moved(source), moved(destination))
+        self._selection = [moved(name) for name in self._selection]
+        return new
+
+    def select(self, *nodes, **kwargs):
+        if kwargs.get('d') or kwargs.get('deselect') or kwargs.get('cl') or kwargs.get('clear'):
+            self._selection = []
+            return
+        flat = []
+        for node in nodes:
+            flat += node if isinstance(node, (list, tuple)) else [node]
+        self._selection = [self._resolve(node) for node in flat]
+
+    def objExists(self, name):
+        try:
+            if '.' not in str(name):
+                return bool(self._resolve(name))
+            return self._attrDefault(self._plug(name))[0]
+        except ValueError:
+            return False
+
+    def nodeType(self, node):
+        return self._nodes[self._resolve(node)].nodeType
+
+    def allNodeTypes(self):
+        return sorted(_SCHEMAS)
+
+    def playbackOptions(self, query=False, min=False, max=False, **kwargs):
+        return 1.0 if min else 120.0
+
+    def currentTime(self, time=None, query=False, q=False, update=True):
+        if query or q:
+            return self._time
+        self._time = float(time)
+        return self._time
+
+    def pluginInfo(self, plugin, query=False, loaded=False):
+        return os.path.abspath(plugin) in self._plugins
+
+    def loadPlugin(self, path, quiet=False):
+        '''Imports a Python plugin under a name of its own, as Maya does, and runs its initializePlugin'''
+        path = os.path.abspath(path)
+        name = '_fakePlugin_' + os.path.splitext(os.path.basename(path))[0]
+        try:
+            import importlib.util
+        except ImportError:
+            import imp
+            module = imp.load_source(name, path)
+        else:
+            spec = importlib.util.spec_from_file_location(name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        module.initializePlugin(sys.modules['maya.api.OpenMaya'].MObject())
+        self._plugins.add(path)
+        return [name]
+
+    def about(self, batch=False, version=False):
+        # Runs like mayapy, there is no viewport to refresh
+        return True if batch else 'FakeDG'
+
+    def evaluationManager(self, query=False, mode=None):
+        if query:
+            return [self._evaluationMode]
+        self._evaluationMode = mode
+
+    def ls(self, *patterns, **kwargs):
+        longNames = kwargs.get('long') or kwargs.get('l')
+        nodeTypes = kwargs.get('type')
+        if isinstance(nodeTypes, str):
+            nodeTypes = [nodeTypes]
+        if kwargs.get('sl') or kwargs.get('selection'):
+            names = list(self._selection)
+        elif patterns:
+            names = []
+            for pattern in patterns:
+                for item in (pattern if isinstance(pattern, (list, tuple)) else [pattern]):
+                    item = str(item)
+                    if item.startswith('*.'):
+                        attr = item[2:]
+                        names += [name for name, node in self._nodes.items()
+                                  if attr in node.dynamic or attr in _SCHEMAS[node.nodeType]]
+                    elif '*' in item:
+                        names += [name for name in self._nodes if fnmatch.fnmatchcase(name, item)]
+                    elif self.objExists(item):
+                        names.append(self._resolve(item.split('.')[0]))
+        else:
+            names = list(self._nodes)
+        if nodeTypes:
+            names = [name for name in names if self._nodes[name].nodeType in nodeTypes]
+        return [self._longName(name) if longNames else name for name in names]
+
+    def listRelatives(self, node, children=False, c=False, parent=False, p=False, type=None, fullPath=False,
+                      f=False):
+        node = self._resolve(node)
+        if parent or p:
+            names = [self._nodes[node].parent] if self._nodes[node].parent else []
+        else:
+            names = [name for name, child in self._nodes.items() if child.parent == node]
+        if type:
+            names = [name for name in names if self._nodes[name].nodeType == type]
+        if fullPath or f:
+            names = [self._longName(name) for name in names]
+        return names or None
+
+    def attributeQuery(self, attr, node=None, n=None, exists=False, ex=False):
+        return self._attrDefault(self._plug(attr, node or n))[0]
+
+    @_command
+    def addAttr(self, node, ln=None, longName=None, at=None, attributeType=None, dt=None, dataType=None, k=False,
+                keyable=False, dv=None, defaultValue=None, multi=False, m=False, indexMatters=True, im=True, **kwargs):
+        name = self._resolve(node)
+        attr = ln or longName
+        if self._attrDefault(name + '.' + attr)[0]:
+            raise RuntimeError("Found a duplicate attribute name: %s" % attr)
+        kind = at or attributeType or dt or dataType
+        default = dv if dv is not None else defaultValue
+        if default is None:
+            default = {'double': 0.0, 'bool': False, 'enum': 0, 'matrix': _IDENTITY, 'string': ''}.get(kind)
+        dynamic = dict(self._nodes[name].dynamic)
+        dynamic[attr] = (default, multi or m)
+        self._setField(self._nodes[name], 'dynamic', dynamic)
+
+    @_command
+    def deleteAttr(self, plug=None, attribute=None, at=None):
+        plug = self._plug(plug) if attribute is None and at is None else self._plug(attribute or at, plug)
+        nodeName, _, attr = plug.partition('.')
+        self._breakAll(plug)
+        for key in [key for key in self._values if key == plug or key.startswith(plug + '[')]:
+            self._setValue(key, None)
+            self._values.pop(key)
+        dynamic = dict(self._nodes[nodeName].dynamic)
+        dynamic.pop(attr)
+        self._setField(self._nodes[nodeName], 'dynamic', dynamic)
+
+    def getAttr(self, plug, multiIndices=False, mi=False, **kwargs):
+        plug = self._plug(plug)
+        if multiIndices or mi:
+            return self._indices(plug) or None
+        if kwargs.get('lock') or kwargs.get('l'):
+            return plug.partition('.')[2] in self._nodes[plug.partition('.')[0]].locked
+        if kwargs.get('keyable') or kwargs.get('k'):
+            return True
+        if kwargs.get('settable') or kwargs.get('se'):
+            # Not locked, and either unconnected or only animated
+            nodeName, _, attr = plug.partition('.')
+            if attr in self._nodes[nodeName].locked or attr.rstrip(_XYZ) in self._nodes[nodeName].locked:
+                return False
+            sources = [self._sources[related] for related in self._related(plug) if related in self._sources]
+            return all(self._nodes[source.partition('.')[0]].nodeType.startswith('animCurve') for source in sources)
+        time = kwargs.get('time', kwargs.get('t'))
+        if time is not None:
+            current, self._time = self._time, float(time)
+            try:
+                value = self._read(plug)
+            finally:
+                self._time = current
+        else:
+            value = self._read(plug)
+        if isinstance(value, tuple) and len(value) == 3:
+            return [value]
+        if isinstance(value, tuple):
+            return list(value)
+        return value
+
+    @_command
+    def setAttr(self, plug, *values, **kwargs):
+        plug = self._plug(plug)
+        lock = kwargs.get('l', kwargs.get('lock'))
+        nodeName, _, attr = plug.partition('.')
+        node = self._nodes[nodeName]
+        if lock is not None:
+            self._setField(node, 'locked', node.locked | set([attr]) if lock else node.locked - set([attr]))
+        if not values:
+            return
+        if attr in node.locked or attr.rstrip(_XYZ) in node.locked:
+            raise RuntimeError("The attribute '%s' is locked or connected and cannot be modified." % plug)
+        if any(related in self._sources for related in self._related(plug)):
+            raise RuntimeError("The attribute '%s' is locked or connected and cannot be modified." % plug)
+        if kwargs.get('type') == 'matrix':
+            value = tuple(float(v) for v in values[0])
+        elif kwargs.get('type') == 'string':
+            value = values[0]
+        elif len(values) == 3:
+            for axis, value in zip(_XYZ, values):
+                self._setValue(plug + axis, float(value))
+            return
+        else:
+            value = values[0]
+        self._setValue(plug, value)
+
+    def _breakAll(self, plug):
+        '''Disconnects every connection on plug and any plug under it'''
+        under = lambda key: key == plug or key.startswith(plug + '[') or key.startswith(plug + '.')
+        for destination, source in list(self._sources.items()):
+            if under(destination) or under(source):
+                self._disconnect(destination)
+
+    @_command
+    def connectAttr(self, source, destination, force=False, f=False, nextAvailable=False, na=False):
+        source, destination = self._plug(source), self._plug(destination)
+        if nextAvailable or na:
+            indices = self._indices(destination)
+            destination = '%s[%d]' % (destination, indices[-1] + 1 if indices else 0)
+        for related in self._related(destination):
+            if related in self._sources:
+                if self._sources[related] == source and related == destination:
+                    raise RuntimeError("%s is already connected to %s." % (source, destination))
+                if not (force or f):
+                    raise RuntimeError("%s already has an incoming connection from %s." %
+                                       (related, self._sources[related]))
+                self._disconnect(related)
+        self._connect(source, destination)
+
+    @_command
+    def disconnectAttr(self, source, destination):
+        source, destination = self._plug(source), self._plug(destination)
+        if self._sources.get(destination) != source:
+            raise RuntimeError("There is no connection from '%s' to '%s' to disconnect." % (source, destination))
+        self._disconnect(destination)
+
+    def isConnected(self, source, destination):
+        return self._sources.get(self._plug(destination)) == self._plug(source)
+
+    def listConnections(self, obj, s=True, d=True, c=False, p=False, type=None, source=None, destination=None,
+                        connections=None, plugs=None):
+        s = s if source is None else source
+        d = d if destination is None else destination
+        c = c if connections is None else connections
+        p = p if plugs is None else plugs
+        if '.' in str(obj):
+            base = self._plug(obj)
+            mine = lambda plug: plug == base or plug.startswith(base + '[') or plug.startswith(base + '.')
+        else:
+            base = self._resolve(obj)
+            mine = lambda plug: plug.partition('.')[0] == base
+        result = []
+        for destinationPlug, sourcePlug in self._sources.items():
+            for this, other, wanted in ((destinationPlug, sourcePlug, s), (sourcePlug, destinationPlug, d)):
+                if not wanted or not mine(this):
+                    continue
+                otherNode = other.partition('.')[0]
+                if type and self._nodes[otherNode].nodeType != type:
+                    continue
+                if c:
+                    result.append(this)
+                result.append(other if p else otherNode)
+        return result or None
+
+    @_command
+    def removeMultiInstance(self, plug, b=False, breakConnections=False):
+        plug = self._plug(plug)
+        connected = [key for key in self._sources.items() if plug in (key[0], key[1]) or
+                     key[0].startswith(plug + '.') or key[1].startswith(plug + '.')]
+        if connected and not (b or breakConnections):
+            raise RuntimeError("%s is connected, use the breakConnections flag to remove it." % plug)
+        self._breakAll(plug)
+        for key in [key for key in self._values if key == plug or key.startswith(plug + '.')]:
+            self._setValue(key, None)
+            self._values.pop(key)
+
+    @_command
+    def delete(self, *nodes):
+        flat = []
+        for node in nodes:
+            flat += node if isinstance(node, (list, tuple)) else [node]
+        names = []
+        for node in flat:
+            if self._resolve(node) not in names:
+                names.append(self._resolve(node))
+        # Transforms take their descendants with them
+        pending = list(names)
+        while pending:
+            children = [name for name, node in self._nodes.items() if node.parent == pending[0] and name not in names]
+            names += children
+            pending = pending[1:] + children
+        for name in names:
+            for destination, source in list(self._sources.items()):
+                if name in (destination.partition('.')[0], source.partition('.')[0]):
+                    self._disconnect(destination)
+            for key in [key for key in self._values if key.partition('.')[0] == name]:
+                self._setValue(key, None)
+                self._values.pop(key)
+            self._removeNode(name)
+        self._selection = [name for name in self._selection if name in self._nodes]
+
+    # Helpers for checks
+
+    def worldMatrix(self, node):
+        '''World matrix of a transform as a 4x4 numpy array'''
+        return self._worldMatrix(self._resolve(node))
+
+    def nodeCount(self, nodeType=None):
+        return len([node for node in self._nodes.values() if nodeType is None or node.nodeType == nodeType])
+
+
+_MISSING = object()
+
+# FakeDG methods exposed as maya.cmds functions
+_CMDS = ('about', 'addAttr', 'allNodeTypes', 'attributeQuery', 'connectAttr', 'createNode', 'currentTime', 'delete',
+         'deleteAttr', 'disconnectAttr', 'evaluationManager', 'getAttr', 'isConnected', 'listConnections',
+         'listRelatives', 'loadPlugin', 'ls', 'nodeType', 'objExists', 'playbackOptions', 'pluginInfo',
+         'removeMultiInstance', 'rename', 'select', 'setAttr', 'undo', 'undoInfo')
+
+
+class _Attribute(object):
+    '''Stands in for an attribute MObject, created by the attribute function sets or looked up by name'''
+
+    def __init__(self, name, kind=None, default=None):
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.array = False
+        self.keyable = False
+        self.indexMatters = True
+        self.fields = []
+
+
+def _openMayaModule(dg):
+    '''Fake maya.api.OpenMaya covering world matrix reads, plugs, modifiers, attributes, plugins and callbacks'''
+    om = types.ModuleType('maya.api.OpenMaya')
+    world = _Node('', 'world')
+
+    class MFn(object):
+        kDagNode, kWorld, kAnimCurve = 1, 2, 3
+
+    class MObject(object):
+        def __init__(self, node=None):
+            self._node = node
+
+        def hasFn(self, fn):
+            if self._node is None:
+                return False
+            if fn == MFn.kWorld:
+                return self._node is world
+            if fn == MFn.kDagNode:
+                return self._node is world or self._node.nodeType == 'transform'
+            return fn == MFn.kAnimCurve and self._node.nodeType.startswith('animCurve')
+
+        def isNull(self):
+            return self._node is None
+
+        def __eq__(self, other):
+            return isinstance(other, MObject) and self._node is other._node
+
+        def __ne__(self, other):
+            return not self == other
+
+        def __hash__(self):
+            return id(self._node)
+
+    class MObjectHandle(object):
+        def __init__(self, obj):
+            self._obj = obj
+
+        def object(self):
+            return self._obj
+
+        def hashCode(self):
+            return id(self._obj._node)
+
+        def isValid(self):
+            return dg._nodes.get(self._obj._node.name) is self._obj._node
+
+    class MFnDependencyNode(object):
+        def __init__(self, obj=None):
+            self._node = None if obj is None else obj._node
+
+        def name(self):
+            return self._node.name
+
+        def hasAttribute(self, name):
+            return dg._nodeAttrDefault(self._node, name)[0]
+
+        def attribute(self, name):
+            return _Attribute(_ALIASES.get(name, name))
+
+        def findPlug(self, attr, wantNetworked=False):
+            name = attr.name if isinstance(attr, _Attribute) else _ALIASES.get(attr, attr)
+            if not self.hasAttribute(name):
+                raise RuntimeError("(kInvalidParameter): Cannot find the plug %s.%s" % (self._node.name, name))
+            return MPlug._at(self._node, name)
+
+    class MFnDagNode(MFnDependencyNode):
+        def parentCount(self):
+            return 1
+
+        def parent(self, index):
+            return MObject(dg._nodes[self._node.parent] if self._node.parent else world)
+
+        def fullPathName(self):
+            return dg._longName(self._node.name)
+
+    class MFnAttribute(object):
+        def __init__(self, attr=None):
+            self._attr = attr
+
+        @property
+        def name(self):
+            return self._attr.name
+
+        def _field(name):
+            return property(lambda self: getattr(self._attr, name),
+                            lambda self, value: setattr(self._attr, name, value))
+
+        keyable, array, indexMatters = _field('keyable'), _field('array'), _field('indexMatters')
+        del _field
+
+    class MFnNumericData(object):
+        kDouble = 1
+
+    class MFnData(object):
+        kString = 1
+
+    class MFnNumericAttribute(MFnAttribute):
+        def create(self, name, shortName, dataType, default=0.0):
+            self._attr = _Attribute(name, 'double', default)
+            return self._attr
+
+    class MFnEnumAttribute(MFnAttribute):
+        def create(self, name, shortName, default=0):
+            self._attr = _Attribute(name, 'enum', default)
+            return self._attr
+
+        def addField(self, field, index):
+            self._attr.fields.append(field)
+
+    class MFnTypedAttribute(MFnAttribute):
+        def create(self, name, shortName, dataType):
+            self._attr = _Attribute(name, 'string', '')
+            return self._attr
+
+    class MFnMessageAttribute(MFnAttribute):
+        def create(self, name, shortName):
+            self._attr = _Attribute(name, 'message')
+            return self._attr
+
+    class MPxCommand(object):
+        pass
+
+    class MFnPlugin(object):
+        def __init__(self, plugin=None, vendor='', version='', apiVersion='Any'):
+            pass
+
+        def registerCommand(self, name, creator):
+            dg._registerCommand(name, creator)
+
+        def deregisterCommand(self, name):
+            dg._deregisterCommand(name)
+
+    class MMatrix(object):
+        def __init__(self, values=_IDENTITY):
+            self._matrix = _asMatrix(list(values))
+
+        def __iter__(self):
+            return iter(self._matrix.ravel().tolist())
+
+        def __mul__(self, other):
+            return MMatrix(np.matmul(self._matrix, other._matrix).ravel())
+
+        def inverse(self):
+            return MMatrix(np.linalg.inv(self._matrix).ravel())
+
+    class MSpace(object):
+        kTransform = 1
+
+    class MEulerRotation(object):
+        '''Radians in the xyz order unless reordered'''
+
+        def __init__(self, x=0.0, y=0.0, z=0.0, order=0):
+            self.x, self.y, self.z, self.order = x, y, z, order
+
+        def reorder(self, order):
+            rotation = composeMatrices(rotate=np.degrees([self.x, self.y, self.z]))[:3, :3]
+            return MEulerRotation(*(eulerFromRotation(rotation, order).tolist() + [order]))
+
+    class MTransformationMatrix(object):
+        '''Scale, shear, rotate and translate of a matrix, rotate kept as an MEulerRotation in the xyz order'''
+
+        def __init__(self, matrix=None):
+            parts = decomposeMatrices(np.identity(4) if matrix is None else matrix._matrix)
+            self._parts = dict((name, value.tolist()) for name, value in parts.items())
+
+        def translation(self, space):
+            return list(self._parts['translate'])
+
+        def scale(self, space):
+            return list(self._parts['scale'])
+
+        def shear(self, space):
+            return list(self._parts['shear'])
+
+        def rotation(self, asQuaternion=False):
+            return MEulerRotation(*np.radians(self._parts['rotate']).tolist())
+
+        def setTranslation(self, value, space):
+            self._parts['translate'] = list(value)
+
+        def setScale(self, value, space):
+            self._parts['scale'] = list(value)
+
+        def setShear(self, value, space):
+            self._parts['shear'] = list(value)
+
+        def setRotation(self, rotation):
+            self._parts['rotate'] = np.degrees([rotation.x, rotation.y, rotation.z]).tolist()
+
+        def asMatrix(self):
+            return MMatrix(composeMatrices(**self._parts).ravel())
+
+    class MDagPath(object):
+        def __init__(self, node=None):
+            self._node = node
+
+        def node(self):
+            return MObject(self._node)
+
+        def inclusiveMatrix(self):
+            return MMatrix(dg._worldMatrix(self._node.name).ravel())
+
+        def fullPathName(self):
+            return dg._longName(self._node.name)
+
+        @staticmethod
+        def getAPathTo(obj):
+            return MDagPath(obj._node)
+
+    class MPlug(object):
+        '''A node and an attribute path, the plug's name follows renames of the node'''
+
+        def __init__(self, obj=None, attr=None):
+            self._node = None if obj is None else obj._node
+            self._path = '' if attr is None else attr.name
+
+        @staticmethod
+        def _at(node, path):
+            plug = MPlug()
+            plug._node, plug._path = node, path
+            return plug
+
+        @staticmethod
+        def _named(name):
+            nodeName, _, path = dg._plug(name).partition('.')
+            return MPlug._at(dg._nodes[nodeName], path)
+
+        def __eq__(self, other):
+            return isinstance(other, MPlug) and self._node is other._node and self._path == other._path
+
+        def __ne__(self, other):
+            return not self == other
+
+        @property
+        def isNull(self):
+            return self._node is None
+
+        def name(self):
+            return '%s.%s' % (self._node.name, self._path)
+
+        def node(self):
+            return MObject(self._node)
+
+        def attribute(self):
+            return _Attribute(self._path.rpartition('.')[2].partition('[')[0])
+
+        @property
+        def isElement(self):
+            return self._path.endswith(']')
+
+        @property
+        def isCompound(self):
+            return self._path in _COMPOUNDS
+
+        @property
+        def isChild(self):
+            return '.' in self._path or (self._path[-1] in _XYZ and self._path[:-1] in _COMPOUNDS)
+
+        @property
+        def isDestination(self):
+            return self.name() in dg._sources
+
+        def numChildren(self):
+            return len(_XYZ) if self.isCompound else 0
+
+        def child(self, attr):
+            if isinstance(attr, int):
+                return MPlug._at(self._node, self._path + _XYZ[attr])
+            return MPlug._at(self._node, '%s.%s' % (self._path, attr.name))
+
+        def parent(self):
+            if '.' in self._path:
+                return MPlug._at(self._node, self._path.rpartition('.')[0])
+            return MPlug._at(self._node, self._path[:-1])
+
+        def elementByLogicalIndex(self, index):
+            return MPlug._at(self._node, '%s[%d]' % (self._path, index))
+
+        def source(self):
+            source = dg._sources.get(self.name())
+            return MPlug() if source is None else MPlug._named(source)
+
+        def getExistingArrayAttributeIndices(self):
+            return dg._indices(self.name())
+
+        def _connectedIndices(self):
+            prefix = self.name() + '['
+            return sorted(set(int(destination[len(prefix):].split(']')[0]) for destination in dg._sources
+                              if destination.startswith(prefix)))
+
+        def numConnectedElements(self):
+            return len(self._connectedIndices())
+
+        def connectionByPhysicalIndex(self, index):
+            return self.elementByLogicalIndex(self._connectedIndices()[index])
+
+        def asDouble(self):
+            value = dg._read(self.name())
+            # Angles read in internal units
+            if self._isAngle():
+                return float(np.radians(value))
+            return float(value)
+
+        def asMObject(self):
+            return MMatrix(dg._read(self.name()))
+
+        def _isAngle(self):
+            return self._path.rstrip(_XYZ) in ('rotate', 'outputRotate')
+
+        # Lock state is set straight away and is not undoable, as with Maya's MPlug
+        @property
+        def isLocked(self):
+            return self._path in self._node.locked
+
+        @isLocked.setter
+        def isLocked(self, value):
+            self._node.locked = self._node.locked | set([self._path]) if value else self._node.locked - set([self._path])
+
+        @property
+        def isKeyable(self):
+            return True
+
+        @isKeyable.setter
+        def isKeyable(self, value):
+            pass
+
+    class MSelectionList(object):
+        def __init__(self):
+            self._items = []
+
+        def add(self, name):
+            name = str(name)
+            if '.' not in name and not dg.objExists(name):
+                raise RuntimeError("(kInvalidParameter): Object does not exist")
+            self._items.append(name)
+
+        def length(self):
+            return len(self._items)
+
+        def getDependNode(self, index):
+            return MObject(dg._nodes[dg._resolve(self._items[index])])
+
+        def getDagPath(self, index):
+            return MDagPath(dg._nodes[dg._resolve(self._items[index])])
+
+        def getPlug(self, index):
+            return MPlug._named(self._items[index])
+
+    class MFnMatrixData(object):
+        '''The data object of a matrix is the MMatrix itself'''
+
+        def __init__(self, data=None):
+            self._data = data
+
+        def create(self, matrix):
+            self._data = matrix
+            return matrix
+
+        def matrix(self):
+            return self._data
+
+    class MDGModifier(object):
+        '''
+        Queues edits and makes them on doIt(). The edits are kept off the undo queue, undoIt() reverts the last doIt()
+        and a failing doIt() reverts the edits it already made.
+        '''
+
+        def __init__(self):
+            self._operations = []
+            self._inverses = []
+
+        def doIt(self):
+            inverses = []
+            with dg._capturing(inverses):
+                try:
+                    for operation in self._operations:
+                        operation()
+                except:
+                    dg._replay(inverses)
+                    raise
+            self._inverses = inverses
+
+        def undoIt(self):
+            inverses, self._inverses = self._inverses, []
+            dg._replay(inverses)
+
+        def _newNode(self, nodeType, parent=None):
+            if nodeType not in _SCHEMAS:
+                raise TypeError("Unknown node type: %s" % nodeType)
+            node = _Node(nodeType + '1', nodeType)
+
+            def create():
+                node.name = dg._uniqueName(node.name)
+                node.parent = parent._node.name if parent is not None and parent._node is not world else None
+                dg._addNode(node)
+            self._operations.append(create)
+            return MObject(node)
+
+        def createNode(self, nodeType):
+            return self._newNode(nodeType)
+
+        def renameNode(self, obj, name):
+            self._operations.append(lambda: dg.rename(obj._node.name, name))
+
+        def deleteNode(self, obj):
+            self._operations.append(lambda: dg.delete(obj._node.name))
+
+        def addAttribute(self, obj, attr):
+            kwargs = {'ln': attr.name, 'multi': attr.array, 'dv': attr.default}
+            if attr.kind == 'string':
+                kwargs['dt'] = 'string'
+            else:
+                kwargs['at'] = attr.kind
+                kwargs['enumName'] = ':'.join(attr.fields)
+            self._operations.append(lambda: dg.addAttr(obj._node.name, **kwargs))
+
+        def removeAttribute(self, obj, attr):
+            self._operations.append(lambda: dg.deleteAttr('%s.%s' % (obj._node.name, attr.name)))
+
+        def connect(self, source, destination):
+            def connect():
+                plug = destination.name()
+                for related in dg._related(plug):
+                    if related in dg._sources:
+                        raise RuntimeError("(kInvalidParameter): %s already has an incoming connection" % related)
+                dg._connect(source.name(), plug)
+            self._operations.append(connect)
+
+        def disconnect(self, source, destination):
+            def disconnect():
+                if dg._sources.get(destination.name()) != source.name():
+                    raise RuntimeError("(kInvalidParameter): %s is not connected to %s" %
+                                       (source.name(), destination.name()))
+                dg._disconnect(destination.name())
+            self._operations.append(disconnect)
+
+        def removeMultiInstance(self, plug, breakConnections):
+            self._operations.append(lambda: dg.removeMultiInstance(plug.name(), b=breakConnections))
+
+        def _newValue(self, plug, value):
+            self._operations.append(lambda: dg._setValue(plug.name(), value()))
+
+        def newPlugValueDouble(self, plug, value):
+            # Angles are given in internal units
+            angle = plug._isAngle()
+            self._newValue(plug, lambda: float(np.degrees(value)) if angle else float(value))
+
+        def newPlugValueBool(self, plug, value):
+            self._newValue(plug, lambda: bool(value))
+
+        def newPlugValueInt(self, plug, value):
+            self._newValue(plug, lambda: int(value))
+
+        def newPlugValueString(self, plug, value):
+            self._newValue(plug, lambda: str(value))
+
+        def newPlugValue(self, plug, data):
+            self._newValue(plug, lambda: tuple(data))
+
+    class MDagModifier(MDGModifier):
+        def createNode(self, nodeType, parent=None):
+            return self._newNode(nodeType, parent)
+
+    class MTime(object):
+        '''A time in frames'''
+        kFilm = 6
+
+        def __init__(self, value=0.0, unit=6):
+            self.value = float(value)
+
+        @staticmethod
+        def uiUnit():
+            return MTime.kFilm
+
+        def asUnits(self, unit):
+            return self.value
+
+        def __eq__(self, other):
+            return self.value == other.value
+
+        def __ne__(self, other):
+            return self.value != other.value
+
+        def __lt__(self, other):
+            return self.value < other.value
+
+        def __le__(self, other):
+            return self.value <= other.value
+
+        def __gt__(self, other):
+            return self.value > other.value
+
+        def __ge__(self, other):
+            return self.value >= other.value
+
+    class MTimeArray(list):
+        pass
+
+    class MDoubleArray(list):
+        pass
+
+    class MDGContext(object):
+        '''Evaluation at a time, makeCurrent() moves the fake's evaluation time like Maya 2019+'''
+
+        def __init__(self, time=None):
+            self._time = time
+
+        def makeCurrent(self):
+            previous = MDGContext(MTime(dg._time))
+            if self._time is not None:
+                dg._time = self._time.value
+            return previous
+
+    class MMessage(object):
+        @staticmethod
+        def removeCallback(callbackId):
+            dg._removeCallback(callbackId)
+
+        @staticmethod
+        def removeCallbacks(callbackIds):
+            for callbackId in callbackIds:
+                dg._removeCallback(callbackId)
+
+    class MDGMessage(MMessage):
+        @staticmethod
+        def addConnectionCallback(function, clientData=None):
+            return dg._addCallback('connection', lambda source, destination, made: function(
+                MPlug._named(source), MPlug._named(destination), made, clientData))
+
+        @staticmethod
+        def addNodeRemovedCallback(function, nodeType='dependNode', clientData=None):
+            def removed(node):
+                if nodeType == 'dependNode' or node.nodeType == nodeType:
+                    function(MObject(node), clientData)
+            return dg._addCallback('nodeRemoved', removed)
+
+    class MDagMessage(MMessage):
+        @staticmethod
+        def addParentAddedCallback(function, clientData=None):
+            return dg._addCallback('parentAdded', lambda node: function(
+                MDagPath(node), MDagPath(dg._nodes[node.parent]), clientData))
+
+    class MSceneMessage(MMessage):
+        (kAfterNew, kAfterOpen, kAfterImport, kAfterCreateReference, kAfterLoadReference, kAfterUnloadReference,
+         kAfterRemoveReference) = ('kAfterNew', 'kAfterOpen', 'kAfterImport', 'kAfterCreateReference',
+                                   'kAfterLoadReference', 'kAfterUnloadReference', 'kAfterRemoveReference')
+
+        @staticmethod
+        def addCallback(message, function, clientData=None):
+            return dg._addCallback(message, lambda: function(clientData))
+
+    class MAngle(object):
+        kRadians, kDegrees = 1, 2
+
+        def __init__(self, value=0.0, unit=1):
+            self._radians = value if unit == self.kRadians else np.radians(value)
+
+        def asUnits(self, unit):
+            return self._radians if unit == self.kRadians else float(np.degrees(self._radians))
+
+        @staticmethod
+        def uiUnit():
+            return MAngle.kDegrees
+
+    class MDistance(object):
+        kCentimeters = 6
+
+        def __init__(self, value=0.0, unit=6):
+            self._value = value
+
+        def asUnits(self, unit):
+            return self._value
+
+        @staticmethod
+        def uiUnit():
+            return MDistance.kCentimeters
+
+    for cls in (MFn, MObject, MObjectHandle, MFnDependencyNode, MFnDagNode, MFnAttribute, MFnNumericData, MFnData,
+                MFnNumericAttribute, MFnEnumAttribute, MFnTypedAttribute, MFnMessageAttribute, MPxCommand, MFnPlugin,
+                MMatrix, MSpace, MEulerRotation, MTransformationMatrix, MDagPath, MPlug, MSelectionList,
+                MFnMatrixData, MDGModifier, MDagModifier, MTime, MTimeArray, MDoubleArray, MDGContext, MMessage,
+                MDGMessage, MDagMessage, MSceneMessage, MAngle, MDistance):
+        setattr(om, cls.__name__, cls)
+    return om
+
+
+def _openMayaAnimModule(dg, om):
+    '''Fake maya.api.OpenMayaAnim covering keying through MFnAnimCurve'''
+    oma = types.ModuleType('maya.api.OpenMayaAnim')
+
+    class MAnimCurveChange(object):
+        '''Records curve edits, undoIt() and redoIt() replay them'''
+
+        def __init__(self):
+            self._edits = []
+
+        def undoIt(self):
+            for node, before, _ in reversed(self._edits):
+                node.keys = before
+
+        def redoIt(self):
+            for node, _, after in self._edits:
+                node.keys = after
+
+    class MFnAnimCurve(object):
+        kAnimCurveTA, kAnimCurveTL, kAnimCurveTT, kAnimCurveTU = 0, 1, 2, 3
+        kTangentGlobal, kTangentFixed, kTangentLinear, kTangentFlat, kTangentSmooth = 0, 1, 2, 3, 4
+        kTangentStep = _TANGENT_STEP
+        _NODE_TYPES = {0: 'animCurveTA', 1: 'animCurveTL', 3: 'animCurveTU'}
+
+        def __init__(self, obj=None):
+            self._node = None if obj is None else obj._node
+
+        def create(self, plug, animCurveType=None, modifier=None):
+            '''
+            Creates a curve animating plug. Given a modifier the curve is created and connected on its doIt(),
+            otherwise straight away and off the undo queue.
+            '''
+            if animCurveType is not None and (isinstance(animCurveType, bool) or
+                                              not isinstance(animCurveType, int)):
+                raise TypeError("create() argument 2 (animCurveType) must be int, not %s" %
+                                type(animCurveType).__name__)
+            if animCurveType is None:
+                animCurveType = (self.kAnimCurveTA if plug._isAngle() else
+                                 self.kAnimCurveTL if plug._path.rstrip(_XYZ) == 'translate' else self.kAnimCurveTU)
+            nodeType = self._NODE_TYPES[animCurveType]
+            if modifier is not None:
+                curve = modifier.createNode(nodeType)
+                modifier.connect(om.MPlug._at(curve._node, 'output'), plug)
+            else:
+                curve = om.MObject(_Node(dg._uniqueName(nodeType + '1'), nodeType))
+                with dg._capturing([]):
+                    dg._addNode(curve._node)
+                    dg._connect(curve._node.name + '.output', plug.name())
+            self._node = curve._node
+            return curve
+
+        def name(self):
+            return self._node.name
+
+        @property
+        def numKeys(self):
+            return len(self._node.keys)
+
+        def input(self, index):
+            return om.MTime(self._node.keys[index][0])
+
+        def value(self, index):
+            return self._node.keys[index][1]
+
+        def _edit(self, keys, change):
+            before, self._node.keys = self._node.keys, tuple(keys)
+            if change is not None:
+                change._edits.append((self._node, before, self._node.keys))
+
+        def remove(self, index, change=None):
+            self._edit(self._node.keys[:index] + self._node.keys[index + 1:], change)
+
+        def addKeys(self, times, values, tangentInType=0, tangentOutType=0, keepExistingKeys=False, change=None):
+            added = [(time.value, float(value), tangentInType, tangentOutType) for time, value in zip(times, values)]
+            kept = []
+            if keepExistingKeys:
+                addedTimes = set(key[0] for key in added)
+                kept = [key for key in self._node.keys if key[0] not in addedTimes]
+            self._edit(sorted(kept + added), change)
+
+    class MAnimUtil(object):
+        @staticmethod
+        def findAnimation(plug):
+            source = dg._sources.get(plug.name())
+            if source is None or not dg._nodes[source.partition('.')[0]].nodeType.startswith('animCurve'):
+                return []
+            return [om.MObject(dg._nodes[source.partition('.')[0]])]
+
+    for cls in (MAnimCurveChange, MFnAnimCurve, MAnimUtil):
+        setattr(oma, cls.__name__, cls)
+    return oma
+
+
+_dg = None
+
+
+def install(force=False):
+    '''
+    Registers fake maya, maya.cmds, maya.api, maya.api.OpenMaya and maya.api.OpenMayaAnim modules backed by a new
+    FakeDG. Import MatrixConstraint after this so it binds to them.
+
+    :param force: Mark True to replace modules that are already imported, real Maya ones included
+    :return: The FakeDG
+    '''
+    global _dg
+    if not force and 'maya.cmds' in sys.modules and not getattr(sys.modules['maya.cmds'], 'FAKE', False):
+        raise RuntimeError("maya.cmds is already imported, pass force=True to replace it.")
+    _dg = FakeDG()
+    cmds = types.ModuleType('maya.cmds')
+    cmds.FAKE = True
+    for name in _CMDS:
+        setattr(cmds, name, getattr(_dg, name))
+    _dg.module = cmds
+    om = _openMayaModule(_dg)
+    oma = _openMayaAnimModule(_dg, om)
+    api = types.ModuleType('maya.api')
+    api.OpenMaya, api.OpenMayaAnim = om, oma
+    maya = types.ModuleType('maya')
+    maya.cmds, maya.api = cmds, api
+    sys.modules.update({'maya': maya, 'maya.cmds': cmds, 'maya.api': api, 'maya.api.OpenMaya': om,
+                        'maya.api.OpenMayaAnim': oma})
+    return _dg
+
+
+def fakeDG():
+    '''The FakeDG of the last install()'''
+    return _dg
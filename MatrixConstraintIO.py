@@ -0,0 +1,203 @@
+'''
+    File name: MatrixConstraintIO.py
+    Python Version: 2.7
+    Round-trips matrix constraint networks through a JSON-lines file. Each line describes one network: its driven,
+    drivers, constraint types with their axes, wtAddMatrix style weights, output and recipe, and the maintainOffset
+    matrices packed as little endian float64 in base64. The first line is a header naming the format version.
+
+        exportMatrixConstraints('/tmp/rig.mcl')
+        importMatrixConstraints('/tmp/rig.mcl')
+
+    The importer streams the file and hands records to matrixConstraintBatch a chunk at a time, so memory use does
+    not grow with the file.
+'''
+
+import base64
+import json
+import struct
+from collections import OrderedDict
+
+from maya import cmds
+
+from MatrixConstraint.MatrixConstraint import (CONSTRAINT_TYPES, SPACE_ATTR, _TYPE_OUTPUTS, _constrainedChannels,
+                                               _findChains, _longName, _settingsNameType, matrixConstraintBatch,
+                                               undoFunc)
+
+FORMAT = 'matrixConstraint'
+VERSION = 1
+
+
+def packMatrices(matrices):
+    '''Packs 4x4 matrices given as 16 floats each into a base64 string'''
+    flat = [float(value) for matrix in matrices for value in matrix]
+    return base64.b64encode(struct.pack('<%dd' % len(flat), *flat)).decode('ascii')
+
+
+def unpackMatrices(packed):
+    '''Inverse of packMatrices, returns a list of 16 float tuples'''
+    data = base64.b64decode(packed)
+    flat = struct.unpack('<%dd' % (len(data) // 8), data)
+    return [flat[i:i + 16] for i in range(0, len(flat), 16)]
+
+
+def _unsequentialWeights(sequential):
+    '''
+    Turns blendMatrix target weights back into wtAddMatrix style weights summing to 1, the inverse of
+    MatrixConstraintPlan._sequentialWeights. The first driver is the blendMatrix inputMatrix and has a weight of 1.
+    '''
+    weights, total = [0.0] * len(sequential), 1.0
+    for i in reversed(range(len(sequential))):
+        weights[i] = sequential[i] * total
+        total -= weights[i]
+    return weights
+
+
+def _chainWeights(chain):
+    if chain.recipe == 'direct':
+        return [1.0]
+    if chain.recipe == 'spaceSwitch':
+        # The active space is the only driver weighted, matrixConstraintBatch starts the rebuilt network on it
+        space = cmds.getAttr(chain.settings + '.' + SPACE_ATTR)
+        return [1.0 if i == space else 0.0 for i in range(len(chain.drivers))]
+    if chain.recipe == 'blendMatrix':
+        indices = cmds.getAttr(chain.wt + '.target', multiIndices=True) or []
+        return _unsequentialWeights([1.0] + [cmds.getAttr('%s.target[%d].weight' % (chain.wt, index))
+                                             for index in indices])
+    return [cmds.getAttr('%s.wtMatrix[%d].weightIn' % (chain.wt, index))
+            for index in cmds.getAttr(chain.wt + '.wtMatrix', multiIndices=True) or []]
+
+
+def _chainOffsets(chain):
+    '''
+    maintainOffset matrices per driver, None when the chain has none. Networks built before the offset moved in front
+    of the driver hold an object space offset that does not carry over, those are recomputed on import.
+    '''
+    if not chain.maintainOffset:
+        return None
+    matrices = []
+    for offset in chain.entryOffsets:
+        if offset is None or not cmds.listConnections(offset + '.matrixIn[1]', s=True, d=False):
+            return None
+        matrices.append(cmds.getAttr(offset + '.matrixIn[0]'))
+    return matrices
+
+
+def _typeAxes(driven, chain, constraintType):
+    '''Axes a constraint type drives, read from the connections of its first output. None when nothing is connected'''
+    if chain.pick is not None:
+        return 'all'
+    connections = _constrainedChannels(driven, chain.decomp, _TYPE_OUTPUTS[constraintType][:1], expand=False)
+    if not connections:
+        return None
+    if any(destination[-1] not in 'XYZ' for _, destination in connections):
+        return 'all'
+    connected = set(destination[-1].lower() for _, destination in connections)
+    return ''.join(axis for axis in 'xyz' if axis in connected)
+
+
+def networkRecords(drivens=None):
+    '''
+    Yields one record dict per network.
+
+    :param drivens: Constrained transforms to export, defaults to every driven with a network in the scene
+    '''
+    if drivens is None:
+        settings = cmds.ls('*.constraintTypes', objectsOnly=True, recursive=True, long=True) or []
+        # Networks built before constraintTypes was recorded are only recognisable by their settings name
+        settings += [node for node in cmds.ls('*_ConstraintSettings', type='transform', recursive=True, long=True) or []
+                     if _settingsNameType(node) is not None]
+        drivens = OrderedDict.fromkeys(node.rsplit('|', 1)[0] for node in settings if node.count('|') > 1)
+    for driven in drivens:
+        driven = _longName(str(driven))
+        for chain in _findChains(driven):
+            types = OrderedDict()
+            for constraintType in chain.types:
+                axes = _typeAxes(driven, chain, constraintType)
+                if axes:
+                    types[constraintType] = axes
+            if not types or None in chain.drivers:
+                continue
+            offsets = _chainOffsets(chain)
+            yield OrderedDict([('driven', driven),
+                               ('drivers', chain.drivers),
+                               ('types', types),
+                               ('weights', _chainWeights(chain)),
+                               ('maintainOffset', chain.maintainOffset),
+                               ('offsets', None if offsets is None else packMatrices(offsets)),
+                               ('output', chain.output),
+                               ('recipe', chain.recipe)])
+
+
+def exportMatrixConstraints(path, drivens=None):
+    '''
+    Writes the networks on drivens to a JSON-lines file.
+
+    :param drivens: Constrained transforms to export, defaults to every driven with a network in the scene
+    :return: Number of networks written
+    '''
+    count = 0
+    with open(path, 'w') as stream:
+        stream.write(json.dumps({'format': FORMAT, 'version': VERSION}) + '\n')
+        for record in networkRecords(drivens):
+            stream.write(json.dumps(record, separators=(',', ':')) + '\n')
+            count += 1
+    return count
+
+
+def readRecords(stream):
+    '''Yields the network records of an open file one line at a time'''
+    for number, line in enumerate(stream):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if number == 0:
+            if record.get('format') != FORMAT or record.get('version', 0) > VERSION:
+                raise ValueError("Not a matrix constraint file, or written by a newer version.")
+            continue
+        yield record
+
+
+def recordSpecs(record):
+    '''
+    Batch specs rebuilding one record, and the (output, recipe, singleWeight) they have to be built with.
+    '''
+    offsets = record.get('offsets')
+    if offsets is not None:
+        offsets = unpackMatrices(offsets)
+    recipe = record.get('recipe', 'legacy')
+    singleWeight = recipe in ('legacy', 'spaceSwitch') and len(record['drivers']) == 1
+    key = (record.get('output', 'trs'), 'legacy' if recipe == 'direct' else recipe, singleWeight)
+    specs = [(record['drivers'], record['driven'], constraintType, record['types'][constraintType],
+              record.get('maintainOffset', False), record.get('weights'), offsets)
+             for constraintType in CONSTRAINT_TYPES if constraintType in record['types']]
+    return key, specs
+
+
+@undoFunc
+def importMatrixConstraints(path, backend='api', chunkSize=5000):
+    '''
+    Rebuilds the networks of a JSON-lines file. Records are read lazily and built chunkSize at a time, one
+    matrixConstraintBatch call per output and recipe in each chunk. The import is one undo chunk, or one journal
+    with the undo queue off, so a failing chunk also takes back the chunks built before it.
+
+    :param backend: 'cmds' or 'api', see matrixConstraint
+    :return: Number of networks read
+    '''
+    count = 0
+    pending = OrderedDict()
+    with open(path) as stream:
+        for record in readRecords(stream):
+            key, specs = recordSpecs(record)
+            pending.setdefault(key, []).extend(specs)
+            count += 1
+            if count % chunkSize == 0:
+                _buildPending(pending, backend)
+                pending = OrderedDict()
+    _buildPending(pending, backend)
+    return count
+
+
+def _buildPending(pending, backend):
+    for (output, recipe, singleWeight), specs in pending.items():
+        matrixConstraintBatch(specs, backend=backend, output=output, recipe=recipe, singleWeight=singleWeight)
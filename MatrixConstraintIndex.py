@@ -0,0 +1,224 @@
+'''
+    File name: MatrixConstraintIndex.py
+    Python Version: 2.7
+    In-memory index of the matrix constraint networks in the scene. Each settings node tags its network with message
+    attributes, constraintDrivers holds the drivers and constraintNodes the matrix nodes, and the driven is the settings
+    node's parent. The index reads those tags once and Maya callbacks keep it current, so asking what constrains a node,
+    what a node drives or for every network in the scene is a dictionary lookup instead of a scene scan.
+
+        index = constraintIndex()
+        index.constrainedBy('arm_ctrl')
+        index.drivenBy('world_ctrl')
+
+    Callbacks only mark the networks they touch as dirty, those are re-read on the next lookup. A batch build
+    therefore costs a set insert per connection until something actually asks the index. Networks built before
+    the tags existed are indexed under their driven only, those from before constraintTypes was recorded are found
+    by their <driven>_<type>_ConstraintSettings name.
+'''
+
+from maya import cmds
+from maya.api import OpenMaya as om
+
+from MatrixConstraint.MatrixConstraint import TAG_DRIVERS, TAG_NODES, _settingsNameType
+
+_TYPES_ATTR = 'constraintTypes'
+_TAGS = (TAG_DRIVERS, TAG_NODES)
+_RESET_MESSAGES = ('kAfterNew', 'kAfterOpen', 'kAfterImport', 'kAfterCreateReference', 'kAfterLoadReference',
+                   'kAfterUnloadReference', 'kAfterRemoveReference')
+
+
+def _handle(node):
+    '''MObjectHandle of a node name, PyNode or MObject'''
+    if not isinstance(node, om.MObject):
+        selList = om.MSelectionList()
+        selList.add(str(node))
+        node = selList.getDependNode(0)
+    return om.MObjectHandle(node)
+
+
+def _name(handle):
+    '''Full path of a DAG node, name of any other node'''
+    obj = handle.object()
+    if obj.hasFn(om.MFn.kDagNode):
+        return om.MFnDagNode(obj).fullPathName()
+    return om.MFnDependencyNode(obj).name()
+
+
+def _tagged(nodeFn, tag):
+    '''Handles of the nodes connected to one of the settings node's tag attributes'''
+    if not nodeFn.hasAttribute(tag):
+        return []
+    plug = nodeFn.findPlug(tag, False)
+    return [om.MObjectHandle(plug.connectionByPhysicalIndex(i).source().node())
+            for i in range(plug.numConnectedElements())]
+
+
+class _Network(object):
+    '''Handles of one network's settings node, driven, drivers and matrix nodes'''
+
+    __slots__ = ('settings', 'driven', 'drivers', 'nodes')
+
+    def __init__(self, settings, driven, drivers, nodes):
+        self.settings = settings
+        self.driven = driven
+        self.drivers = drivers
+        self.nodes = nodes
+
+
+class ConstraintIndex(object):
+    '''
+    Lookup tables of every tagged network keyed by MObjectHandle hash codes, which survive renames and namespace
+    changes. install() hooks the callbacks keeping it current, uninstall() removes them.
+    '''
+
+    def __init__(self):
+        self._networks = {}
+        self._byDriven = {}
+        self._byDriver = {}
+        # Settings nodes whose tags changed since the last lookup, and whether the whole scene needs re-reading
+        self._dirty = {}
+        self._stale = True
+        self._callbacks = []
+
+    def install(self):
+        if self._callbacks:
+            return
+        self._callbacks.append(om.MDGMessage.addConnectionCallback(self._onConnection))
+        self._callbacks.append(om.MDGMessage.addNodeRemovedCallback(self._onNodeRemoved, 'transform'))
+        self._callbacks.append(om.MDagMessage.addParentAddedCallback(self._onParentAdded))
+        for message in _RESET_MESSAGES:
+            self._callbacks.append(om.MSceneMessage.addCallback(getattr(om.MSceneMessage, message), self._onReset))
+        self._stale = True
+
+    def uninstall(self):
+        om.MMessage.removeCallbacks(self._callbacks)
+        self._callbacks = []
+
+    # Callbacks, kept to the cost of a set insert as they fire for every edit in the scene
+
+    def _onConnection(self, srcPlug, destPlug, made, clientData=None):
+        if destPlug.isElement and om.MFnAttribute(destPlug.attribute()).name in _TAGS:
+            self._markDirty(om.MObjectHandle(destPlug.node()))
+
+    def _onNodeRemoved(self, node, clientData=None):
+        handle = om.MObjectHandle(node)
+        if handle.hashCode() in self._networks:
+            self._markDirty(handle)
+
+    def _onParentAdded(self, child, parent, clientData=None):
+        handle = om.MObjectHandle(child.node())
+        if handle.hashCode() in self._networks:
+            self._markDirty(handle)
+
+    def _onReset(self, clientData=None):
+        self._stale = True
+
+    def _markDirty(self, handle):
+        self._dirty[handle.hashCode()] = handle
+
+    # Index maintenance
+
+    def rebuild(self):
+        '''Re-reads every settings node in the scene, including ones in namespaces and references'''
+        # Cleared in place, a lookup may already hold one of the tables
+        for table in (self._networks, self._byDriven, self._byDriver, self._dirty):
+            table.clear()
+        settingsNodes = set(cmds.ls('*.' + _TYPES_ATTR, objectsOnly=True, recursive=True, long=True) or [])
+        # Networks built before constraintTypes was recorded are only recognisable by their settings name
+        settingsNodes.update(cmds.ls('*_ConstraintSettings', type='transform', recursive=True, long=True) or [])
+        for settings in settingsNodes:
+            self._add(_handle(settings))
+        self._stale = False
+
+    def _flush(self):
+        if self._stale:
+            self.rebuild()
+            return
+        dirty, self._dirty = self._dirty, {}
+        for key, handle in dirty.items():
+            self._remove(key)
+            if handle.isValid():
+                self._add(handle)
+
+    def _add(self, handle):
+        settingsFn = om.MFnDagNode(handle.object())
+        if not settingsFn.parentCount():
+            return
+        if not settingsFn.hasAttribute(_TYPES_ATTR) and _settingsNameType(settingsFn.name()) is None:
+            return
+        drivers = _tagged(settingsFn, TAG_DRIVERS)
+        network = _Network(handle, om.MObjectHandle(settingsFn.parent(0)), drivers, _tagged(settingsFn, TAG_NODES))
+        key = handle.hashCode()
+        self._networks[key] = network
+        self._byDriven.setdefault(network.driven.hashCode(), set()).add(key)
+        for driver in drivers:
+            self._byDriver.setdefault(driver.hashCode(), set()).add(key)
+
+    def _remove(self, key):
+        network = self._networks.pop(key, None)
+        if network is None:
+            return
+        for table, handles in ((self._byDriven, [network.driven]), (self._byDriver, network.drivers)):
+            for node in handles:
+                keys = table.get(node.hashCode())
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del table[node.hashCode()]
+
+    def _lookup(self, table, node):
+        self._flush()
+        return [self._networks[key] for key in table.get(_handle(node).hashCode(), ())
+                if self._networks[key].settings.isValid()]
+
+    # Queries, all returning current node names
+
+    def constrainedBy(self, driven):
+        '''
+        :return: Settings nodes of the networks constraining driven
+        '''
+        return [_name(network.settings) for network in self._lookup(self._byDriven, driven)]
+
+    def drivenBy(self, driver):
+        '''
+        :return: Driven nodes of the networks driver takes part in, each listed once
+        '''
+        driven = []
+        for network in self._lookup(self._byDriver, driver):
+            name = _name(network.driven)
+            if name not in driven:
+                driven.append(name)
+        return driven
+
+    def networks(self):
+        '''
+        :return: Settings nodes of every matrix constraint network in the scene
+        '''
+        self._flush()
+        return [_name(network.settings) for network in self._networks.values() if network.settings.isValid()]
+
+    def network(self, settings):
+        '''
+        :return: dict with the 'settings', 'driven', 'drivers' and 'nodes' of one network, None when settings is not
+              an indexed settings node
+        '''
+        self._flush()
+        network = self._networks.get(_handle(settings).hashCode())
+        if network is None:
+            return None
+        return {'settings': _name(network.settings),
+                'driven': _name(network.driven),
+                'drivers': [_name(driver) for driver in network.drivers if driver.isValid()],
+                'nodes': [_name(node) for node in network.nodes if node.isValid()]}
+
+
+_index = None
+
+
+def constraintIndex():
+    '''The scene's ConstraintIndex, built and hooked up to Maya's callbacks on first use'''
+    global _index
+    if _index is None:
+        _index = ConstraintIndex()
+        _index.install()
+    return _index
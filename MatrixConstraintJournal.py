@@ -0,0 +1,229 @@
+'''
+    File name: MatrixConstraintJournal.py
+    Python Version: 2.7
+    Rollback for builds run with Maya's undo queue off, as headless mayapy rig builds usually are. While a journal is
+    active the builder's maya.cmds calls go through it. It records the nodes a build creates and how it edits nodes
+    that already existed, and it holds back deletes until the build succeeds. Nodes waiting to be deleted are renamed
+    out of the way first, so nodes built in their place get the same names. Modifiers committed through
+    commitModifiers, by the 'api' backend, bakes and switchSpace, are recorded as they are committed. A failure then
+    removes the new nodes, undoes the committed modifiers and restores every edited name, connection and value.
+
+        with journaledBuild():
+            matrixConstraintBatch(specs)
+
+    journaledBuild turns the undo queue off for the block by default. Builds wrapped by undoFunc journal themselves
+    whenever the undo queue is off, so a failing call is rolled back inside a block as well as outside one.
+'''
+
+import sys
+
+from maya import cmds
+
+# Modules whose cmds calls are journaled
+_JOURNALED = ('MatrixConstraint.MatrixConstraint', 'MatrixConstraint.MatrixConstraintIO')
+# Commands that destroy something and are held back until the outermost journal succeeds, delete has its own handler
+_DEFERRED = ('deleteAttr', 'removeMultiInstance')
+# Name nodes waiting for a deferred delete are moved to, '#' makes it unique
+_DELETED_NAME = '%s_journalDeleted#'
+
+
+def _shortName(name):
+    return str(name).split('.')[0].split('|')[-1]
+
+
+class BuildJournal(object):
+    '''
+    Stands in for maya.cmds while active. Creating and editing commands are recorded, destructive ones deferred and
+    everything else is passed through untouched.
+    '''
+
+    def __init__(self, commands):
+        self._cmds = commands
+        self.created = []
+        self._createdNames = set()
+        # (command, args, kwargs) undoing one edit of a node that existed before the journal
+        self.entries = []
+        # (command, args, kwargs) to run once the outermost scope succeeds
+        self.deferred = []
+
+    def __getattr__(self, name):
+        if name in _DEFERRED:
+            return lambda *args, **kwargs: self.deferred.append((name, args, kwargs))
+        return getattr(self._cmds, name)
+
+    def _isNew(self, plug):
+        return _shortName(plug) in self._createdNames
+
+    def _created(self, name):
+        self.created.append(name)
+        self._createdNames.add(_shortName(name))
+        return name
+
+    def mark(self):
+        return len(self.created), len(self.entries), len(self.deferred)
+
+    def modifiersDone(self, modifiers):
+        '''Records modifiers commitModifiers has done, a rollback undoes them in reverse'''
+        self.entries.append(('_undoModifiers', (list(modifiers),), {}))
+
+    # Journaled commands
+
+    def createNode(self, *args, **kwargs):
+        return self._created(self._cmds.createNode(*args, **kwargs))
+
+    def addAttr(self, node, **kwargs):
+        self._cmds.addAttr(node, **kwargs)
+        if not self._isNew(node):
+            self.entries.append(('deleteAttr', ('%s.%s' % (node, kwargs.get('ln') or kwargs.get('longName')),), {}))
+
+    def setAttr(self, plug, *values, **kwargs):
+        if not self._isNew(plug):
+            if values:
+                self.entries.append(self._restoreValue(plug, kwargs.get('type')))
+            for flag, query in (('l', 'lock'), ('lock', 'lock'), ('k', 'keyable'), ('keyable', 'keyable')):
+                if flag in kwargs:
+                    self.entries.append(('setAttr', (plug,), {query: self._cmds.getAttr(plug, **{query: True})}))
+        self._cmds.setAttr(plug, *values, **kwargs)
+
+    def _restoreValue(self, plug, valueType):
+        value = self._cmds.getAttr(plug)
+        if valueType is not None:
+            return 'setAttr', (plug, value), {'type': valueType}
+        if isinstance(value, list) and value and isinstance(value[0], tuple):
+            return 'setAttr', (plug,) + tuple(value[0]), {}
+        return 'setAttr', (plug, value), {}
+
+    def connectAttr(self, source, destination, **kwargs):
+        if not self._isNew(destination):
+            if kwargs.get('force') or kwargs.get('f'):
+                self._recordIncoming(destination)
+            if kwargs.get('nextAvailable') or kwargs.get('na'):
+                indices = self._cmds.getAttr(destination, multiIndices=True) or []
+                destination = '%s[%d]' % (destination, indices[-1] + 1 if indices else 0)
+                kwargs = dict((key, value) for key, value in kwargs.items() if key not in ('nextAvailable', 'na'))
+            # Connections from new nodes go with them
+            if not self._isNew(source):
+                self.entries.append(('_disconnect', (source, destination), {}))
+        self._cmds.connectAttr(source, destination, **kwargs)
+
+    def _recordIncoming(self, destination):
+        '''Records the connections a forced connection to destination, its compound parent or children would break'''
+        node, attr = destination.split('.', 1)
+        connections = self._cmds.listConnections(node, s=True, d=False, c=True, p=True) or []
+        for incoming, source in zip(connections[::2], connections[1::2]):
+            incomingAttr = incoming.split('.', 1)[1]
+            if incomingAttr.startswith(attr) or attr.startswith(incomingAttr):
+                self.entries.append(('connectAttr', (source, incoming), {'force': True}))
+
+    def delete(self, *nodes, **kwargs):
+        '''
+        Deletes nodes the journal created straight away. Older nodes are renamed out of the way and their delete is
+        deferred, a rollback gives them their names back.
+        '''
+        flat = []
+        for node in nodes:
+            flat += list(node) if isinstance(node, (list, tuple)) else [node]
+        new = [node for node in flat if self._isNew(node)]
+        if new:
+            self._cmds.delete(new, **kwargs)
+        renamed = []
+        # Deepest first, renaming a parent would break the paths of its children still in the list
+        for node in sorted([node for node in flat if not self._isNew(node)], key=lambda node: -str(node).count('|')):
+            name = _shortName(node)
+            renamed.append(self._cmds.rename(node, _DELETED_NAME % name))
+            self.entries.append(('rename', (renamed[-1], name), {}))
+        if renamed:
+            self.deferred.append(('delete', (renamed,), kwargs))
+
+    def disconnectAttr(self, source, destination):
+        if not (self._isNew(source) or self._isNew(destination)):
+            self.entries.append(('connectAttr', (source, destination), {}))
+        self._cmds.disconnectAttr(source, destination)
+
+    # Scope ends
+
+    def commit(self, mark=(0, 0, 0)):
+        '''Runs the deferred commands since mark'''
+        deferred, self.deferred = self.deferred[mark[2]:], self.deferred[:mark[2]]
+        for name, args, kwargs in deferred:
+            getattr(self._cmds, name)(*args, **kwargs)
+
+    def rollback(self, mark=(0, 0, 0)):
+        '''Deletes the nodes created since mark and undoes the recorded edits, newest first'''
+        created = [node for node in self.created[mark[0]:] if self._cmds.objExists(node)]
+        entries = self.entries[mark[1]:]
+        del self.created[mark[0]:]
+        del self.entries[mark[1]:]
+        del self.deferred[mark[2]:]
+        self._createdNames = set(_shortName(node) for node in self.created)
+        if created:
+            self._cmds.delete(created)
+        for name, args, kwargs in reversed(entries):
+            if name == '_undoModifiers':
+                for modifier in reversed(args[0]):
+                    modifier.undoIt()
+            elif name == '_disconnect':
+                if self._cmds.isConnected(*args):
+                    self._cmds.disconnectAttr(*args)
+            elif name != 'connectAttr' or not self._cmds.isConnected(*args):
+                getattr(self._cmds, name)(*args, **kwargs)
+
+
+_active = None
+
+
+def activeJournal():
+    return _active
+
+
+class journaledBuild(object):
+    '''
+    Journals the builds inside the with block and rolls them back when it raises. Blocks nest, an inner block rolls
+    back only its own edits and deferred deletes run when the outermost block exits cleanly.
+
+    :param disableUndo: Mark True to turn the undo queue off for the block, it is restored afterwards
+    '''
+
+    def __init__(self, disableUndo=True):
+        self.disableUndo = disableUndo
+        self._mark = None
+        self._undoState = None
+        self._patched = []
+
+    def __enter__(self):
+        global _active
+        if _active is not None:
+            self._mark = _active.mark()
+            return _active
+        if self.disableUndo:
+            self._undoState = cmds.undoInfo(query=True, state=True)
+            cmds.undoInfo(stateWithoutFlush=False)
+        # Journals on top of whatever the builder currently calls, a build profile's counters included
+        _active = BuildJournal(getattr(sys.modules.get(_JOURNALED[0]), 'cmds', cmds))
+        for name in _JOURNALED:
+            module = sys.modules.get(name)
+            if module is not None and hasattr(module, 'cmds'):
+                self._patched.append((module, module.cmds))
+                module.cmds = _active
+        return _active
+
+    def __exit__(self, excType, exc, traceback):
+        global _active
+        journal = _active
+        if self._mark is not None:
+            if excType is not None:
+                journal.rollback(self._mark)
+            return False
+        try:
+            if excType is not None:
+                journal.rollback()
+            else:
+                journal.commit()
+        finally:
+            for module, commands in self._patched:
+                module.cmds = commands
+            self._patched = []
+            _active = None
+            if self._undoState is not None:
+                cmds.undoInfo(stateWithoutFlush=self._undoState)
+        return False
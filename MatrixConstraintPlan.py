@@ -0,0 +1,380 @@
+'''
+    File name: MatrixConstraintPlan.py
+    Python Version: 2.7
+    Maya-free planning layer of MatrixConstraint. planChain() decides which nodes a constraint network needs, the
+    values they start with and how they are wired, and returns that as a Plan. The builder backends in
+    MatrixConstraint apply plans to the scene, writeMa() writes one out as Maya ASCII, and a plan can be inspected,
+    counted or rewritten by optimizer passes without Maya at all.
+
+        plan = planMatrixConstraint(['cone1', 'sphere1'], 'cube1', ['parent'])
+        plan.nodeCounts()
+
+    Plugs are (node, attribute) pairs. The node is a PlanNode for nodes the plan creates and a node name for nodes
+    that already exist, such as the drivers and the driven. Attributes are Maya plug paths like
+    'wtMatrix[0].matrixIn'.
+'''
+
+from collections import OrderedDict
+
+# Maps each constraint type to the decomposeMatrix outputs it drives on the constrained transform.
+CONSTRAINT_TYPES = ('parent', 'point', 'orient', 'scale')
+_TYPE_OUTPUTS = {'parent': ('Translate', 'Rotate'),
+                 'point': ('Translate',),
+                 'orient': ('Rotate',),
+                 'scale': ('Scale',)}
+# 'trs' drives translate/rotate/scale through a decomposeMatrix, 'offsetParentMatrix' feeds the blended matrix
+# straight into the driven's offsetParentMatrix (Maya 2020+) and masks constraint types with a pickMatrix
+OUTPUTS = ('trs', 'offsetParentMatrix')
+# 'legacy' blends drivers with a wtAddMatrix, 'blendMatrix' (Maya 2020+) blends them with a blendMatrix node and
+# 'spaceSwitch' passes one driver through a choice node picked by an enum on the settings node
+RECIPES = ('legacy', 'blendMatrix', 'spaceSwitch')
+# Output plug of each blend node type
+_BLEND_OUTPUT = {'wtAddMatrix': 'matrixSum', 'blendMatrix': 'outputMatrix', 'choice': 'output'}
+# Enum attribute on the settings node of a spaceSwitch chain selecting its active driver
+SPACE_ATTR = 'space'
+_IDENTITY = (1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+# Multi message attributes on the settings node tagging its drivers and matrix nodes, read by MatrixConstraintIndex
+TAG_DRIVERS = 'constraintDrivers'
+TAG_NODES = 'constraintNodes'
+# pickMatrix flags passing each output of an offsetParentMatrix chain, and the local values that output is reset to
+_PICK_FLAGS = {'Translate': ('useTranslate',), 'Rotate': ('useRotate',), 'Scale': ('useScale', 'useShear')}
+_REST_VALUES = {'Translate': (0.0, 0.0, 0.0), 'Rotate': (0.0, 0.0, 0.0), 'Scale': (1.0, 1.0, 1.0)}
+# Channels locked on the settings transform, like lockNull does
+_SETTINGS_LOCKED = ('visibility',
+                    'translateX', 'translateY', 'translateZ',
+                    'rotateX', 'rotateY', 'rotateZ',
+                    'scaleX', 'scaleY', 'scaleZ')
+
+
+def _shortName(node):
+    '''Leaf name of a node name, long DAG path or PyNode'''
+    return str(node).split('|')[-1]
+
+
+def effectiveRecipe(recipe, drivers, singleWeight=False, hasBlendMatrix=True):
+    '''
+    The recipe a chain is really built with. A single driver is wired straight through ('direct') unless its weight
+    attribute was asked for. blendMatrix falls back to the legacy recipe when the node type does not exist, and for a
+    single driver where there is nothing to blend. spaceSwitch keeps its choice node for a single driver, so the
+    space attribute exists, only when singleWeight asks for it.
+    '''
+    if len(drivers) == 1 and not singleWeight:
+        return 'direct'
+    if recipe == 'spaceSwitch':
+        return 'spaceSwitch'
+    if recipe == 'blendMatrix' and len(drivers) > 1 and hasBlendMatrix:
+        return 'blendMatrix'
+    return 'legacy'
+
+
+def _sequentialWeights(weights):
+    '''
+    Converts wtAddMatrix style weights into blendMatrix target weights. blendMatrix blends each target over the
+    result of the ones before it, so driver i needs w[i] / (w[0] + ... + w[i]) for the same overall influence.
+    The first driver is the blendMatrix inputMatrix and has no weight of its own.
+    '''
+    sequential, total = [], 0.0
+    for weight in weights:
+        total += weight
+        sequential.append(weight / total if total else 0.0)
+    return sequential
+
+
+def _spaceNames(drivers):
+    '''
+    Enum field names of a spaceSwitch settings node, one per driver in choice input order. ':' separates enum fields,
+    so namespaces are stripped, and repeated names get a number so every field stays distinct.
+    '''
+    names, used = [], set()
+    for driver in drivers:
+        name = base = _shortName(driver).split(':')[-1]
+        count = 1
+        while name in used:
+            name = '%s%d' % (base, count)
+            count += 1
+        used.add(name)
+        names.append(name)
+    return ':'.join(names)
+
+
+def _outputPairs(decompAttr, drivenAttr, constraintType, axes):
+    '''Attribute name pairs connecting a decomposeMatrix to the driven for one constraint type and axes'''
+    pairs = []
+    for output in _TYPE_OUTPUTS[constraintType]:
+        if axes == 'all':
+            pairs.append((decompAttr + 'output' + output, drivenAttr + output.lower()))
+        else:
+            pairs += [(decompAttr + 'output' + output + axis, drivenAttr + output.lower() + axis)
+                      for axis in axes.upper()]
+    return pairs
+
+
+class PlanNode(object):
+    '''
+    A node a plan creates. attributes holds the dynamic attributes to add as (name, kind, default) with kind one of
+    'double', 'enum', 'message', 'messageMulti' or 'string', locked the attributes locked once the plan is applied.
+    The default of an 'enum' attribute is its field names as 'a:b:c', it starts on the first field.
+    '''
+
+    __slots__ = ('nodeType', 'name', 'parent', 'attributes', 'locked')
+
+    def __init__(self, nodeType, name, parent=None):
+        self.nodeType = nodeType
+        self.name = name
+        self.parent = parent
+        self.attributes = []
+        self.locked = ()
+
+    def addAttr(self, name, kind, default=None):
+        self.attributes.append((name, kind, default))
+
+    def __repr__(self):
+        return 'PlanNode(%r, %r)' % (self.nodeType, self.name)
+
+
+class Plan(object):
+    '''
+    Nodes to create, values to set and connections to make, each list in the order it has to be applied. Values are
+    bools, ints, floats, strings, 3 float tuples for compound channels or 16 float matrices.
+    '''
+
+    def __init__(self):
+        self.nodes = []
+        self.values = []
+        self.connections = []
+
+    def createNode(self, nodeType, name, parent=None):
+        node = PlanNode(nodeType, name, parent)
+        self.nodes.append(node)
+        return node
+
+    def setAttr(self, node, attr, value):
+        self.values.append(((node, attr), value))
+
+    def connect(self, source, destination):
+        self.connections.append((source, destination))
+
+    def nodeCounts(self):
+        '''
+        :return: OrderedDict of node type to the number of nodes of that type the plan creates
+        '''
+        counts = OrderedDict()
+        for node in self.nodes:
+            counts[node.nodeType] = counts.get(node.nodeType, 0) + 1
+        return counts
+
+
+def plugName(plug, names=None):
+    '''
+    'node.attr' name of a plan plug.
+
+    :param names: dict of PlanNode to the name it got in the scene, defaults to the planned names
+    '''
+    node, attr = plug
+    if isinstance(node, PlanNode):
+        node = names[node] if names is not None else node.name
+    return '%s.%s' % (node, attr)
+
+
+def planDriverSource(plan, driver, drivenName, offset=None):
+    '''
+    Plug feeding driver into a chain and the offset multMatrix in between, planned when an offset is given. The
+    offset is applied as offset * driverWorld.
+    '''
+    source = (driver, 'worldMatrix[0]')
+    if offset is None:
+        return source, None
+    offsetMult = plan.createNode('multMatrix', _shortName(driver) + '_' + drivenName + '_offsetMultMatrix')
+    plan.setAttr(offsetMult, 'matrixIn[0]', tuple(offset))
+    plan.connect(source, (offsetMult, 'matrixIn[1]'))
+    return (offsetMult, 'matrixSum'), offsetMult
+
+
+def planChain(drivers, driven, constraintType, driverOffsets, weights, output='trs', recipe='legacy',
+              hasParent=True, plan=None):
+    '''
+    Plans one chain, the nodes shared by every constraint type of a driven that uses the same drivers.
+
+    :param drivers: Driver node names
+    :param driven: Driven node name
+    :param constraintType: Type the chain is first built for, it only names the nodes
+    :param driverOffsets: maintainOffset matrix per driver as 16 floats, None for no offsets
+    :param weights: wtAddMatrix style weight per driver. A spaceSwitch chain starts on the driver weighted most
+    :param output: 'trs' or 'offsetParentMatrix'
+    :param recipe: Effective recipe, 'legacy', 'blendMatrix', 'spaceSwitch' or 'direct', see effectiveRecipe
+    :param hasParent: False when driven sits at the world root. Only offsetParentMatrix chains use it, they skip the
+          parentInverse multiply there
+    :param plan: Plan to add to, a new one by default
+    :return: (plan, nodes) with nodes a dict of the chain's 'settings', 'wt', 'mult', 'decomp', 'pick' PlanNodes,
+          None where the chain has no such node, and 'offsets' the list of offset multMatrix PlanNodes
+    '''
+    plan = plan if plan is not None else Plan()
+    drivenName = _shortName(driven)
+    prefix = drivenName + '_' + constraintType
+
+    constraintCtrl = plan.createNode('transform', prefix + '_ConstraintSettings', parent=driven)
+    constraintCtrl.locked = _SETTINGS_LOCKED
+
+    decomp = pick = mult = None
+    if output == 'trs':
+        decomp = plan.createNode('decomposeMatrix', prefix + '_decompMatrix')
+    else:
+        pick = plan.createNode('pickMatrix', prefix + '_pickMatrix')
+        for flag in ('useTranslate', 'useRotate', 'useScale', 'useShear'):
+            plan.setAttr(pick, flag, False)
+    # offsetParentMatrix is already in parent space, a driven at the world root needs no parentInverse
+    if output == 'trs' or hasParent:
+        mult = plan.createNode('multMatrix', prefix + '_multMatrix')
+    if recipe == 'direct':
+        wt = None
+    elif recipe == 'blendMatrix':
+        wt = plan.createNode('blendMatrix', prefix + '_blendMatrix')
+        weights = _sequentialWeights(weights)
+    elif recipe == 'spaceSwitch':
+        # Only the selected input is pulled, evaluation cost does not grow with the number of spaces
+        wt = plan.createNode('choice', prefix + '_spaceChoice')
+        constraintCtrl.addAttr(SPACE_ATTR, 'enum', _spaceNames(drivers))
+        space = weights.index(max(weights))
+        if space:
+            plan.setAttr(constraintCtrl, SPACE_ATTR, space)
+        plan.connect((constraintCtrl, SPACE_ATTR), (wt, 'selector'))
+    else:
+        wt = plan.createNode('wtAddMatrix', prefix + '_wtMatrix')
+
+    # Sets up our constraint control under the driven object. Each driver gets a weight attribute feeding its
+    # wtMatrix entry, equal influence between all drivers by default. The blendMatrix recipe feeds the first
+    # driver to inputMatrix and every other driver to a target, the spaceSwitch recipe feeds each driver to a
+    # choice input instead of a weight, and the direct recipe wires its single driver straight into the
+    # parentInverse multiply.
+    offsets = []
+    for iter, driver in enumerate(drivers):
+        source, offsetMult = planDriverSource(plan, driver, drivenName, driverOffsets and driverOffsets[iter])
+        if offsetMult is not None:
+            offsets.append(offsetMult)
+
+        if recipe == 'direct':
+            continue
+        elif recipe == 'spaceSwitch':
+            plan.connect(source, (wt, 'input[%d]' % iter))
+            continue
+        elif recipe == 'blendMatrix':
+            if iter == 0:
+                plan.connect(source, (wt, 'inputMatrix'))
+                continue
+            matrixIn, weightIn = 'target[%d].targetMatrix' % (iter - 1), 'target[%d].weight' % (iter - 1)
+        else:
+            matrixIn, weightIn = 'wtMatrix[%d].matrixIn' % iter, 'wtMatrix[%d].weightIn' % iter
+
+        plan.connect(source, (wt, matrixIn))
+        weightAttr = _shortName(driver) + '_Weight'
+        constraintCtrl.addAttr(weightAttr, 'double', weights[iter])
+        plan.connect((constraintCtrl, weightAttr), (wt, weightIn))
+
+    blended = source if wt is None else (wt, _BLEND_OUTPUT[wt.nodeType])
+    if mult is not None:
+        plan.connect(blended, (mult, 'matrixIn[0]'))
+        plan.connect((driven, 'parentInverseMatrix[0]'), (mult, 'matrixIn[1]'))
+        blended = (mult, 'matrixSum')
+    plan.connect(blended, (decomp if decomp is not None else pick, 'inputMatrix'))
+    if wt is None:
+        constraintCtrl.addAttr('constraintHead', 'message')
+        plan.connect((mult if mult is not None else pick, 'message'), (constraintCtrl, 'constraintHead'))
+
+    # Tags every driver and matrix node of the network so it can be indexed without walking connections
+    for tag, tagged in ((TAG_DRIVERS, drivers), (TAG_NODES, [wt, mult, decomp, pick] + offsets)):
+        constraintCtrl.addAttr(tag, 'messageMulti')
+        for i, node in enumerate([node for node in tagged if node is not None]):
+            plan.connect((node, 'message'), (constraintCtrl, '%s[%d]' % (tag, i)))
+
+    return plan, {'settings': constraintCtrl, 'wt': wt, 'mult': mult, 'decomp': decomp, 'pick': pick,
+                  'offsets': offsets}
+
+
+def planOutputs(plan, nodes, driven, constraintType, axes):
+    '''Plans the connections from a new chain to driven for one constraint type'''
+    if nodes['pick'] is not None:
+        # The pickMatrix passes the type's channels and the driven's own values for them are zeroed
+        for output in _TYPE_OUTPUTS[constraintType]:
+            for flag in _PICK_FLAGS[output]:
+                plan.setAttr(nodes['pick'], flag, True)
+            plan.setAttr(driven, output.lower(), _REST_VALUES[output])
+        if ((nodes['pick'], 'outputMatrix'), (driven, 'offsetParentMatrix')) not in plan.connections:
+            plan.connect((nodes['pick'], 'outputMatrix'), (driven, 'offsetParentMatrix'))
+        return
+    for source, destination in _outputPairs('', '', constraintType, axes):
+        plan.connect((nodes['decomp'], source), (driven, destination))
+
+
+def planMatrixConstraint(drivers, driven, types, axes='all', weights=None, offsets=None, output='trs',
+                         recipe='legacy', singleWeight=False, hasParent=True, hasBlendMatrix=True):
+    '''
+    Dry run of matrixConstraint() for a driven without matrix constraints, every type shares one chain.
+
+    :param types: Constraint types, any of CONSTRAINT_TYPES
+    :param offsets: maintainOffset matrix per driver as 16 floats, None for no offsets
+    :param hasParent: False when driven sits at the world root
+    :param hasBlendMatrix: False to plan for a Maya version without the blendMatrix node
+    :return: Plan
+    '''
+    if not drivers or not types:
+        raise ValueError("Not enough object given to constrain. Please give driver(s) and driven objects in that order.")
+    if any(constraintType not in CONSTRAINT_TYPES for constraintType in types):
+        raise ValueError("Constraint type must be one of %s, got %r." % (', '.join(CONSTRAINT_TYPES), types))
+    if output == 'offsetParentMatrix' and axes != 'all':
+        raise ValueError("offsetParentMatrix output masks whole channels, it needs axes='all'.")
+    if weights is None:
+        weights = [1.0 / len(drivers)] * len(drivers)
+    types = [constraintType for constraintType in CONSTRAINT_TYPES if constraintType in types]
+    plan, nodes = planChain(drivers, driven, types[0], offsets, weights, output,
+                            effectiveRecipe(recipe, drivers, singleWeight, hasBlendMatrix), hasParent)
+    for constraintType in types:
+        planOutputs(plan, nodes, driven, constraintType, axes)
+    nodes['settings'].addAttr('constraintTypes', 'string')
+    plan.setAttr(nodes['settings'], 'constraintTypes', ' '.join(types))
+    return plan
+
+
+def _melValue(value):
+    '''setAttr arguments for a plan value'''
+    if isinstance(value, bool):
+        return 'yes' if value else 'no'
+    if isinstance(value, int):
+        return '%d' % value
+    if isinstance(value, str):
+        return '-type "string" "%s"' % value.replace('\\', '\\\\').replace('"', '\\"')
+    if isinstance(value, (list, tuple)):
+        valueType = 'matrix' if len(value) == 16 else 'double3'
+        return '-type "%s" %s' % (valueType, ' '.join('%.17g' % v for v in value))
+    return '%.17g' % value
+
+
+_MEL_ATTRS = {'double': '-k true -at "double" -dv %s',
+              'enum': '-k true -at "enum" -en "%s"',
+              'message': '-at "message"',
+              'messageMulti': '-m -im false -at "message"',
+              'string': '-dt "string"'}
+
+
+def writeMa(plan, stream):
+    '''
+    Writes a plan as Maya ASCII commands, ready to be appended to a .ma file or sourced as MEL. The planned node
+    names are used as they are, so they must be free in the scene the fragment is loaded into.
+    '''
+    for node in plan.nodes:
+        parent = ' -p "%s"' % node.parent if node.parent is not None else ''
+        stream.write('createNode %s -n "%s"%s;\n' % (node.nodeType, node.name, parent))
+        for name, kind, default in node.attributes:
+            if kind == 'double':
+                flags = _MEL_ATTRS[kind] % ('%.17g' % default)
+            elif kind == 'enum':
+                flags = _MEL_ATTRS[kind] % default
+            else:
+                flags = _MEL_ATTRS[kind]
+            stream.write('\taddAttr -ci true -sn "%s" -ln "%s" %s;\n' % (name, name, flags))
+    for plug, value in plan.values:
+        stream.write('setAttr "%s" %s;\n' % (plugName(plug), _melValue(value)))
+    for source, destination in plan.connections:
+        stream.write('connectAttr "%s" "%s";\n' % (plugName(source), plugName(destination)))
+    for node in plan.nodes:
+        for attr in node.locked:
+            stream.write('setAttr -l on -k off "%s.%s";\n' % (node.name, attr))
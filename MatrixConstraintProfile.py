@@ -0,0 +1,175 @@
+'''
+    File name: MatrixConstraintProfile.py
+    Python Version: 2.7
+    Opt-in instrumentation of constraint builds. While a profile is active every maya.cmds call the builder issues and
+    every OpenMaya modifier operation the 'api' backend queues is counted, and the builder's phases are timed per
+    constraint. Outside of a profile the phase hooks are a shared no-op and nothing is wrapped.
+
+        with profileBuild() as profile:
+            matrixConstraintBatch(specs)
+        profile.summary()
+        profile.writeChromeTrace('/tmp/build.json')
+
+    The trace opens in chrome://tracing or Perfetto, phases nest as they ran and counters are added at the end.
+'''
+
+import json
+import sys
+import time
+from collections import OrderedDict
+
+_clock = getattr(time, 'perf_counter', time.time)
+# Modules whose cmds calls are counted while a profile is active
+_INSTRUMENTED = ('MatrixConstraint.MatrixConstraint', 'MatrixConstraint.MatrixConstraintIO')
+# Counter names adding up to the derived totals of summary()
+_NODES = ('cmds.createNode', 'MDGModifier.createNode', 'MDagModifier.createNode')
+_ATTRIBUTES = ('cmds.addAttr', 'MDGModifier.addAttribute', 'MDagModifier.addAttribute')
+_CONNECTIONS = ('cmds.connectAttr', 'MDGModifier.connect', 'MDagModifier.connect')
+
+
+class BuildProfile(object):
+    '''Counters and timed phase events of the builds run while it was active'''
+
+    def __init__(self):
+        self.counters = OrderedDict()
+        # (name, start, duration, args) with times in seconds from the start of the profile
+        self.events = []
+        self._start = _clock()
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        '''
+        :return: dict with the raw 'counters', the derived 'commands', 'nodes', 'attributes' and 'connections'
+              totals, and the call 'count' and total 'seconds' of each phase
+        '''
+        phases = OrderedDict()
+        for name, _, duration, _ in self.events:
+            phase = phases.setdefault(name, {'count': 0, 'seconds': 0.0})
+            phase['count'] += 1
+            phase['seconds'] += duration
+        total = lambda names: sum(self.counters.get(name, 0) for name in names)
+        return {'counters': dict(self.counters),
+                'commands': total([name for name in self.counters if name.startswith('cmds.')]),
+                'nodes': total(_NODES),
+                'attributes': total(_ATTRIBUTES),
+                'connections': total(_CONNECTIONS),
+                'phases': phases}
+
+    def chromeTrace(self):
+        '''The profile as a Chrome trace event dict, phases as complete events and the counters as one counter event'''
+        events = [{'name': name, 'cat': 'matrixConstraint', 'ph': 'X', 'pid': 0, 'tid': 0,
+                   'ts': start * 1.0e6, 'dur': duration * 1.0e6, 'args': args}
+                  for name, start, duration, args in self.events]
+        end = max([start + duration for _, start, duration, _ in self.events] or [0.0])
+        events.append({'name': 'counters', 'cat': 'matrixConstraint', 'ph': 'C', 'pid': 0, 'tid': 0,
+                       'ts': end * 1.0e6, 'args': dict(self.counters)})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def writeChromeTrace(self, path):
+        with open(path, 'w') as stream:
+            json.dump(self.chromeTrace(), stream)
+
+
+class _Phase(object):
+    __slots__ = ('profile', 'name', 'args', 'start')
+
+    def __init__(self, profile, name, args):
+        self.profile = profile
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = _clock()
+        return self
+
+    def __exit__(self, *exc):
+        end = _clock()
+        self.profile.events.append((self.name, self.start - self.profile._start, end - self.start, self.args))
+        return False
+
+
+class _NullPhase(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+_active = None
+
+
+def phase(name, **args):
+    '''Context manager timing one phase of the active profile, a shared no-op when none is active'''
+    if _active is None:
+        return _NULL_PHASE
+    return _Phase(_active, name, args)
+
+
+def activeProfile():
+    return _active
+
+
+class _Counting(object):
+    '''Stands in for a module or modifier and counts the calls made through it'''
+
+    def __init__(self, target, prefix, profile):
+        self._target = target
+        self._prefix = prefix
+        self._profile = profile
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        key = self._prefix + '.' + name
+        profile = self._profile
+
+        def counted(*args, **kwargs):
+            profile.count(key)
+            return attr(*args, **kwargs)
+        return counted
+
+
+def instrument(obj, prefix):
+    '''obj wrapped to count its calls under prefix while a profile is active, obj itself otherwise'''
+    if _active is None:
+        return obj
+    return _Counting(obj, prefix, _active)
+
+
+class profileBuild(object):
+    '''
+    Activates a BuildProfile for the builds run inside the with block, profiles do not nest.
+
+    :return: The BuildProfile on entering
+    '''
+
+    def __init__(self):
+        self.profile = BuildProfile()
+        self._patched = []
+
+    def __enter__(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("A build profile is already active.")
+        _active = self.profile
+        for name in _INSTRUMENTED:
+            module = sys.modules.get(name)
+            if module is not None and hasattr(module, 'cmds'):
+                self._patched.append((module, module.cmds))
+                module.cmds = _Counting(module.cmds, 'cmds', self.profile)
+        return self.profile
+
+    def __exit__(self, *exc):
+        global _active
+        for module, cmds in self._patched:
+            module.cmds = cmds
+        self._patched = []
+        _active = None
+        return False
@@ -0,0 +1,209 @@
+'''
+    File name: MatrixConstraintUI.py
+    Author: Wayne Moodie
+    Python Version: 2.7
+    Dialog for MatrixConstraint. Kept out of MatrixConstraint.py so importing the builder never loads Qt,
+    MatrixConstraint.showUI() imports this module on demand.
+'''
+
+from MatrixConstraint.Qt import QtWidgets, QtCore, QtGui
+from MatrixConstraint.MatrixConstraint import matrixConstraint
+
+class MatrixConstraintUI(QtWidgets.QDialog):
+
+
+    def __init__(self):
+        super(MatrixConstraintUI, self).__init__()
+        self.setWindowTitle('Matrix Constraints')
+        self.buildUI()
+        self.setWindowFlags(QtCore.Qt.WindowStaysOnTopHint)
+
+
+    def buildUI(self):
+
+        '''
+        Builds and assembles UI elements
+
+        '''
+
+        gridAx = QtWidgets.QGridLayout(self)
+
+
+        maintainOffsetLabel = QtWidgets.QLabel('Maintain Offset:')
+        maintainOffsetLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        self.maintainOffsetBtn = QtWidgets.QCheckBox()
+        gridAx.addWidget(maintainOffsetLabel, 0, 0)
+        gridAx.addWidget(self.maintainOffsetBtn, 0, 1)
+
+
+
+
+        matrixLabel = QtWidgets.QLabel('Matrix Constraint Axes')
+        matrixLabel.setAlignment(QtCore.Qt.AlignRight| QtCore.Qt.AlignVCenter)
+        gridAx.addWidget(matrixLabel, 1, 0)
+
+
+        parentLabel    = QtWidgets.QLabel('Parent Constraint:')
+        parentLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        self.parentCheck   = QtWidgets.QCheckBox('All')
+        gridAx.addWidget(parentLabel, 2, 0)
+        gridAx.addWidget(self.parentCheck, 2, 1)
+
+        self.parentCheckX,self.parentCheckY, self.parentCheckZ = QtWidgets.QCheckBox('X'),\
+                                                                 QtWidgets.QCheckBox('Y'), QtWidgets.QCheckBox('Z')
+        gridAx.addWidget(self.parentCheckX, 3, 1)
+        gridAx.addWidget(self.parentCheckY, 3, 2)
+        gridAx.addWidget(self.parentCheckZ, 3, 3)
+        self.parentCheck.stateChanged.connect(self.parentAll)
+        self.parentCheckX.stateChanged.connect(self.parentSoloAxis)
+        self.parentCheckY.stateChanged.connect(self.parentSoloAxis)
+        self.parentCheckZ.stateChanged.connect(self.parentSoloAxis)
+
+
+
+        pointLabel = QtWidgets.QLabel('Point Constraint:')
+        pointLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        self.pointCheck = QtWidgets.QCheckBox('All')
+        gridAx.addWidget(pointLabel, 4, 0)
+        gridAx.addWidget(self.pointCheck, 4, 1)
+
+        self.pointCheckX, self.pointCheckY, self.pointCheckZ = QtWidgets.QCheckBox('X'), \
+                                                               QtWidgets.QCheckBox('Y'), QtWidgets.QCheckBox('Z')
+        gridAx.addWidget(self.pointCheckX, 5, 1)
+        gridAx.addWidget(self.pointCheckY, 5, 2)
+        gridAx.addWidget(self.pointCheckZ, 5, 3)
+
+        self.pointCheck.stateChanged.connect(self.translateAll)
+        self.pointCheckX.stateChanged.connect(self.translateSoloAxis)
+        self.pointCheckY.stateChanged.connect(self.translateSoloAxis)
+        self.pointCheckZ.stateChanged.connect(self.translateSoloAxis)
+
+
+
+        orientLabel    = QtWidgets.QLabel('Orient Constraint:')
+        orientLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        self.orientCheck   = QtWidgets.QCheckBox('All')
+        gridAx.addWidget(orientLabel, 6, 0)
+        gridAx.addWidget(self.orientCheck, 6, 1)
+
+        self.orientCheckX, self.orientCheckY, self.orientCheckZ = QtWidgets.QCheckBox('X'),\
+                                                                  QtWidgets.QCheckBox('Y'), QtWidgets.QCheckBox('Z')
+        gridAx.addWidget(self.orientCheckX, 7, 1)
+        gridAx.addWidget(self.orientCheckY, 7, 2)
+        gridAx.addWidget(self.orientCheckZ, 7, 3)
+        self.orientCheck.stateChanged.connect(self.rotateAll)
+        self.orientCheckX.stateChanged.connect(self.rotateSoloAxis)
+        self.orientCheckY.stateChanged.connect(self.rotateSoloAxis)
+        self.orientCheckZ.stateChanged.connect(self.rotateSoloAxis)
+
+
+        scaleLabel     = QtWidgets.QLabel('Scale Constraint:')
+        scaleLabel.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        self.scaleCheck  = QtWidgets.QCheckBox('All')
+        gridAx.addWidget(scaleLabel, 8, 0)
+        gridAx.addWidget(self.scaleCheck, 8, 1)
+
+        self.scaleCheckX, self.scaleCheckY, self.scaleCheckZ = QtWidgets.QCheckBox('X'),\
+                                                               QtWidgets.QCheckBox('Y'), QtWidgets.QCheckBox('Z')
+
+        gridAx.addWidget(self.scaleCheckX, 9, 1)
+        gridAx.addWidget(self.scaleCheckY, 9, 2)
+        gridAx.addWidget(self.scaleCheckZ, 9, 3)
+        self.scaleCheck.stateChanged.connect(self.scaleAll)
+        self.scaleCheckX.stateChanged.connect(self.scaleSoloAxis)
+        self.scaleCheckY.stateChanged.connect(self.scaleSoloAxis)
+        self.scaleCheckZ.stateChanged.connect(self.scaleSoloAxis)
+
+
+        pointBtn = QtWidgets.QPushButton('Point Matrix')
+        parentBtn = QtWidgets.QPushButton('Parent Matrix')
+        orientBtn = QtWidgets.QPushButton('Orient Matrix')
+        scaleBtn = QtWidgets.QPushButton('Scale Matrix')
+        close= QtWidgets.QPushButton("Close")
+        gridAx.addWidget(parentBtn, 10, 0)
+        gridAx.addWidget(pointBtn, 10, 1)
+        gridAx.addWidget(orientBtn, 10, 2)
+        gridAx.addWidget(scaleBtn, 10, 3)
+        gridAx.addWidget(close, 11, 0,11,4)
+        pointBtn.clicked.connect(self.pointMat)
+        parentBtn.clicked.connect(self.parentMat)
+        orientBtn.clicked.connect(self.orientMat)
+        scaleBtn.clicked.connect(self.scaleMat)
+        close.clicked.connect(self.close)
+
+
+    '''
+    Builds Functions for each of the buttons Matrix Buttons
+    '''
+    def parentMat(self):
+
+        all  = self.parentCheck.isChecked()
+        x = self.parentCheckX.isChecked()
+        y = self.parentCheckY.isChecked()
+        z = self.parentCheckZ.isChecked()
+        mo = self.maintainOffsetBtn.isChecked()
+        matrixConstraint(parent = True, all = all, x=x, y=y,z=z,maintainOffset=mo)
+
+    def pointMat(self):
+        all  = self.pointCheck.isChecked()
+        x = self.pointCheckX.isChecked()
+        y = self.pointCheckY.isChecked()
+        z = self.pointCheckZ.isChecked()
+        mo = self.maintainOffsetBtn.isChecked()
+        matrixConstraint(point = True, all = all, x=x, y=y,z=z,maintainOffset=mo)
+
+    def orientMat(self):
+        all  = self.orientCheck.isChecked()
+        x = self.orientCheckX.isChecked()
+        y = self.orientCheckY.isChecked()
+        z = self.orientCheckZ.isChecked()
+        mo = self.maintainOffsetBtn.isChecked()
+        matrixConstraint(orient = True, all = all, x=x, y=y,z=z,maintainOffset=mo)
+
+    def scaleMat(self):
+        all  = self.scaleCheck.isChecked()
+        x = self.scaleCheckX.isChecked()
+        y = self.scaleCheckY.isChecked()
+        z = self.scaleCheckZ.isChecked()
+        mo = self.maintainOffsetBtn.isChecked()
+        matrixConstraint(scale = True, all = all, x=x, y=y,z=z, maintainOffset=mo)
+
+
+    '''
+    If The "all" axes is checked it will de-Check the individual Axis and vice versa
+    '''
+    def translateAll(self,toggle):
+        if bool(toggle):
+            self.pointCheckY.setChecked(False)
+            self.pointCheckX.setChecked(False)
+            self.pointCheckZ.setChecked(False)
+    def translateSoloAxis(self, toggle):
+        if bool(toggle):
+            self.pointCheck.setChecked(False)
+
+    def rotateAll(self,toggle):
+        if bool(toggle):
+            self.orientCheckX.setChecked(False)
+            self.orientCheckY.setChecked(False)
+            self.orientCheckZ.setChecked(False)
+    def rotateSoloAxis(self,toggle):
+        if bool(toggle):
+            self.orientCheck.setChecked(False)
+
+    def scaleAll(self,toggle):
+        if bool(toggle):
+            self.scaleCheckX.setChecked(False)
+            self.scaleCheckY.setChecked(False)
+            self.scaleCheckZ.setChecked(False)
+    def scaleSoloAxis(self,toggle):
+        if bool(toggle):
+            self.scaleCheck.setChecked(False)
+
+    def parentAll(self,toggle):
+        if bool(toggle):
+            self.parentCheckX.setChecked(False)
+            self.parentCheckY.setChecked(False)
+            self.parentCheckZ.setChecked(False)
+    def parentSoloAxis(self,toggle):
+        if bool(toggle):
+            self.parentCheck.setChecked(False)
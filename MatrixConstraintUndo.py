@@ -0,0 +1,95 @@
+'''
+    File name: MatrixConstraintUndo.py
+    Python Version: 2.7
+    Puts modifier based builds on Maya's undo queue as a single item. This file is also a Maya plugin registering the
+    matrixConstraintUndo command, commitModifiers() loads it on first use and runs the command, which does the
+    modifiers it is handed and keeps them. Undoing or redoing the item replays the modifiers, so a build of any size is
+    one fast undo step and the undo queue only grows by the modifiers themselves.
+'''
+
+import os
+
+from maya import cmds
+from maya.api import OpenMaya as om
+
+from MatrixConstraint.MatrixConstraintJournal import activeJournal
+
+COMMAND = 'matrixConstraintUndo'
+# (modifiers, after) waiting for the command to pick them up, the command has no arguments to pass them through
+_pending = []
+
+
+def maya_useNewAPI():
+    pass
+
+
+class MatrixConstraintUndoCmd(om.MPxCommand):
+    '''Does a list of modifiers in order, and undoes them in reverse'''
+
+    def __init__(self):
+        om.MPxCommand.__init__(self)
+        self._modifiers = []
+        self._after = None
+
+    def doIt(self, args):
+        # Maya loads the plugin under its own module name, the pending work sits on the package module
+        from MatrixConstraint import MatrixConstraintUndo
+        self._modifiers, self._after = MatrixConstraintUndo._pending.pop()
+        self.redoIt()
+
+    def redoIt(self):
+        done = []
+        try:
+            for modifier in self._modifiers:
+                modifier.doIt()
+                done.append(modifier)
+        except:
+            for modifier in reversed(done):
+                modifier.undoIt()
+            raise
+        if self._after is not None:
+            self._after()
+
+    def undoIt(self):
+        for modifier in reversed(self._modifiers):
+            modifier.undoIt()
+
+    def isUndoable(self):
+        return True
+
+    @staticmethod
+    def creator():
+        return MatrixConstraintUndoCmd()
+
+
+def initializePlugin(plugin):
+    om.MFnPlugin(plugin, 'Wayne Moodie').registerCommand(COMMAND, MatrixConstraintUndoCmd.creator)
+
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterCommand(COMMAND)
+
+
+def _loadPlugin():
+    path = os.path.splitext(os.path.abspath(__file__))[0] + '.py'
+    if not cmds.pluginInfo(path, query=True, loaded=True):
+        cmds.loadPlugin(path, quiet=True)
+
+
+def commitModifiers(modifiers, after=None):
+    '''
+    Does the modifiers in order as one undoable command. When one fails the ones already done are undone. Inside a
+    journaledBuild the journal records them, so a rollback undoes them as well.
+
+    :param modifiers: MDGModifiers or MDagModifiers
+    :param after: Called with no arguments once the modifiers are done, again on every redo
+    '''
+    _loadPlugin()
+    _pending.append((list(modifiers), after))
+    try:
+        getattr(cmds, COMMAND)()
+    finally:
+        del _pending[:]
+    journal = activeJournal()
+    if journal is not None:
+        journal.modifiersDone(modifiers)
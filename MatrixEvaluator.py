@@ -0,0 +1,197 @@
+'''
+    File name: MatrixEvaluator.py
+    Python Version: 2.7
+    NumPy reference evaluator for the networks built by MatrixConstraint.matrixConstraint(). Reproduces the
+    wtAddMatrix -> multMatrix -> decomposeMatrix chain without Maya, vectorized over many constraints and frames.
+    Only the legacy recipe is modelled, blendMatrix interpolates rotations and does not match a weighted sum.
+
+    Matrices follow Maya's row vector convention: translation lives in row 3 and A * B applies A first, which is
+    numpy.matmul(A, B).
+'''
+
+import numpy as np
+
+# Channels each constraint type drives on the constrained transform, mirrors MatrixConstraintPlan._TYPE_OUTPUTS
+TYPE_CHANNELS = {'parent': ('translate', 'rotate'),
+                 'point': ('translate',),
+                 'orient': ('rotate',),
+                 'scale': ('scale',)}
+
+_EPSILON = 1.0e-10
+# Maya's rotateOrder enum, the first axis is applied first
+ROTATE_ORDERS = ('xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx')
+
+
+def blendMatrices(driverMatrices, weights, offsets=None):
+    '''
+    wtAddMatrix, with the optional maintainOffset multMatrix in front of each entry.
+
+    :param driverMatrices: Driver world matrices shaped (N, D, F, 4, 4), N constraints, D drivers, F frames.
+          Constraints with fewer drivers can be padded with any matrix and a weight of 0
+    :param weights: Driver weights shaped (N, D) or (N, D, F) for animated weights
+    :param offsets: Optional maintainOffset matrices shaped (N, D, 4, 4), applied as offset * driverWorld exactly
+          like the offset multMatrix in the network
+    :return: Blended matrices shaped (N, F, 4, 4)
+    '''
+    driverMatrices = np.asarray(driverMatrices, dtype=np.float64)
+    if offsets is not None:
+        driverMatrices = np.matmul(np.asarray(offsets, dtype=np.float64)[:, :, None], driverMatrices)
+
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim == 2:
+        weights = weights[:, :, None]
+    weights = np.broadcast_to(weights, driverMatrices.shape[:3])
+    return np.einsum('ndf,ndfij->nfij', weights, driverMatrices)
+
+
+def decomposeMatrices(matrices, rotateOrder=0):
+    '''
+    decomposeMatrix for any stack of matrices shaped (..., 4, 4).
+    A negative determinant is folded into the scale of all three axes.
+
+    :param rotateOrder: Index into ROTATE_ORDERS the rotation is returned in, like the inputRotateOrder attribute
+
+    :return: dict of 'translate', 'rotate' (degrees), 'scale' and 'shear' arrays shaped (..., 3)
+    '''
+    matrices = np.asarray(matrices, dtype=np.float64)
+    translate = matrices[..., 3, :3].copy()
+    row0, row1, row2 = [matrices[..., i, :3].copy() for i in range(3)]
+
+    # Gram-Schmidt over the rows gives scale and shear, leaving a pure rotation behind
+    scaleX = np.linalg.norm(row0, axis=-1)
+    row0 /= np.maximum(scaleX, _EPSILON)[..., None]
+    shearXY = np.sum(row0 * row1, axis=-1)
+    row1 -= shearXY[..., None] * row0
+    scaleY = np.linalg.norm(row1, axis=-1)
+    row1 /= np.maximum(scaleY, _EPSILON)[..., None]
+    shearXZ = np.sum(row0 * row2, axis=-1)
+    row2 -= shearXZ[..., None] * row0
+    shearYZ = np.sum(row1 * row2, axis=-1)
+    row2 -= shearYZ[..., None] * row1
+    scaleZ = np.linalg.norm(row2, axis=-1)
+    row2 /= np.maximum(scaleZ, _EPSILON)[..., None]
+
+    scale = np.stack([scaleX, scaleY, scaleZ], axis=-1)
+    shear = np.stack([shearXY / np.maximum(scaleY, _EPSILON), shearXZ / np.maximum(scaleZ, _EPSILON),
+                      shearYZ / np.maximum(scaleZ, _EPSILON)], axis=-1)
+    rotation = np.stack([row0, row1, row2], axis=-2)
+
+    flip = np.linalg.det(rotation) < 0
+    scale[flip] *= -1
+    rotation[flip] *= -1
+
+    return {'translate': translate,
+            'rotate': np.degrees(eulerFromRotation(rotation, rotateOrder)),
+            'scale': scale,
+            'shear': shear}
+
+
+def composeMatrices(translate=None, rotate=None, scale=None, shear=None):
+    '''
+    Inverse of decomposeMatrices with the xyz rotate order, scale * shear * rotate * translate. Parts left out are
+    identity, given parts are arrays shaped (..., 3) with rotations in degrees.
+
+    :return: Matrices shaped (..., 4, 4)
+    '''
+    parts = [np.asarray(part, dtype=np.float64) for part in (translate, rotate, scale, shear) if part is not None]
+    shape = np.broadcast(*parts).shape[:-1] if parts else ()
+    matrices = np.broadcast_to(np.identity(4), shape + (4, 4)).copy()
+    if scale is not None:
+        matrices[..., :3, :3] *= np.asarray(scale, dtype=np.float64)[..., :, None]
+    if shear is not None:
+        shear = np.asarray(shear, dtype=np.float64)
+        shearMatrix = np.broadcast_to(np.identity(3), shape + (3, 3)).copy()
+        shearMatrix[..., 1, 0] = shear[..., 0]
+        shearMatrix[..., 2, 0] = shear[..., 1]
+        shearMatrix[..., 2, 1] = shear[..., 2]
+        matrices[..., :3, :3] = np.matmul(matrices[..., :3, :3], shearMatrix)
+    if rotate is not None:
+        radians = np.radians(np.asarray(rotate, dtype=np.float64))
+        for i, (j, k) in enumerate([(1, 2), (2, 0), (0, 1)]):
+            cos, sin = np.cos(radians[..., i]), np.sin(radians[..., i])
+            single = np.broadcast_to(np.identity(3), shape + (3, 3)).copy()
+            single[..., j, j], single[..., j, k], single[..., k, j], single[..., k, k] = cos, sin, -sin, cos
+            matrices[..., :3, :3] = np.matmul(matrices[..., :3, :3], single)
+    if translate is not None:
+        matrices[..., 3, :3] = translate
+    return matrices
+
+
+def pickMatrices(matrices, outputs):
+    '''
+    pickMatrix for any stack of matrices shaped (..., 4, 4), passing only the given outputs.
+
+    :param outputs: Any of 'Translate', 'Rotate', 'Scale', scale passes shear with it like the network's flags do
+    '''
+    decomposed = decomposeMatrices(matrices)
+    parts = dict((output.lower(), decomposed[output.lower()]) for output in outputs)
+    if 'Scale' in outputs:
+        parts['shear'] = decomposed['shear']
+    if not parts:
+        return np.broadcast_to(np.identity(4), np.shape(matrices)).copy()
+    return composeMatrices(**parts)
+
+
+def eulerFromRotation(rotation, rotateOrder=0):
+    '''
+    Euler angles in radians from rotation matrices shaped (..., 3, 3), R = Rx * Ry * Rz for the xyz rotate order.
+    At gimbal lock the last axis is set to 0 and the first takes the whole remaining rotation.
+
+    :param rotateOrder: Index into ROTATE_ORDERS
+    '''
+    rotation = np.asarray(rotation, dtype=np.float64)
+    if rotateOrder:
+        # Relabelling the axes so the order reads xyz turns it into the xyz case. A swap of two axes flips
+        # handedness, which negates every angle
+        order = ['xyz'.index(axis) for axis in ROTATE_ORDERS[rotateOrder]]
+        angles = eulerFromRotation(rotation[..., order, :][..., :, order])
+        if rotateOrder >= 3:
+            angles = -angles
+        return angles[..., np.argsort(order)]
+    cosY = np.hypot(rotation[..., 0, 0], rotation[..., 0, 1])
+    locked = cosY < 1.0e-6
+
+    x = np.where(locked, np.arctan2(-rotation[..., 2, 1], rotation[..., 1, 1]),
+                 np.arctan2(rotation[..., 1, 2], rotation[..., 2, 2]))
+    y = np.arctan2(-rotation[..., 0, 2], cosY)
+    z = np.where(locked, 0.0, np.arctan2(rotation[..., 0, 1], rotation[..., 0, 0]))
+    return np.stack([x, y, z], axis=-1)
+
+
+def evaluateConstraint(driverMatrices, weights, parentInverseMatrices, constraintType='parent', axes='all',
+                       offsets=None):
+    '''
+    Evaluates N constraint networks over F frames in one go.
+
+    :param driverMatrices: Driver world matrices shaped (N, D, F, 4, 4), see blendMatrices
+    :param weights: Driver weights shaped (N, D) or (N, D, F)
+    :param parentInverseMatrices: Driven parentInverseMatrix shaped (N, F, 4, 4), or (N, 1, 4, 4) for static parents
+    :param constraintType: 'parent', 'point', 'orient' or 'scale'
+    :param axes: 'all' or any combination of 'xyz'
+    :param offsets: Optional maintainOffset matrices shaped (N, D, 4, 4)
+    :return: dict with an (N, F, 3) array for each channel the constraint type drives. Axes that are not
+          constrained are NaN since the network leaves them to the driven transform
+    '''
+    if constraintType not in TYPE_CHANNELS:
+        raise ValueError("Constraint type must be one of %s, got %r." % (', '.join(sorted(TYPE_CHANNELS)),
+                                                                          constraintType))
+    blended = blendMatrices(driverMatrices, weights, offsets)
+    local = np.matmul(blended, np.asarray(parentInverseMatrices, dtype=np.float64))
+    decomposed = decomposeMatrices(local)
+
+    mask = np.array([axes == 'all' or axis in axes for axis in 'xyz'])
+    result = {}
+    for channel in TYPE_CHANNELS[constraintType]:
+        result[channel] = np.where(mask, decomposed[channel], np.nan)
+    return result
+
+
+def eulerFilter(angles, axis=0):
+    '''
+    Removes 360 degree flips from sampled euler rotations by unwrapping every channel along the frame axis,
+    each sample is moved by whole turns to sit within half a turn of the previous one.
+
+    :param angles: Rotations in radians, frames along the given axis
+    :return: Filtered rotations in radians, same shape as angles
+    '''
+    return np.unwrap(np.asarray(angles, dtype=np.float64), axis=axis)
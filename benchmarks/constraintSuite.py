@@ -0,0 +1,203 @@
+'''
+    File name: constraintSuite.py
+    Python Version: 2.7
+    Compares matrix constraints with Maya's parent, point, orient and scale constraints on synthetic rigs. For every
+    rig shape, constraint type, method and count it records the build wall time, the nodes the build added, the size
+    of the scene saved as Maya ASCII and the playback rate over an animated frame range. Run it with mayapy:
+
+        mayapy -m MatrixConstraint.benchmarks.constraintSuite [--counts 10,1000,10000] [--output results.jsonl]
+
+    Rig shapes:
+        chain: every driven is the driver of the next one, only the root is animated
+        fanIn: every driven follows --drivers animated drivers
+        fanOut: one animated driver drives every driven
+
+    Prints one JSON record per measurement, and appends them to --output when given so results can be tracked across
+    releases.
+'''
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+SHAPES = ('chain', 'fanIn', 'fanOut')
+METHODS = ('matrixConstraint', 'native')
+COUNTS = (10, 1000, 10000)
+
+
+def rigSpecs(shape, count, constraintType, drivers=4):
+    '''
+    Creates the transforms of one synthetic rig in the current scene.
+
+    :param shape: One of SHAPES
+    :param count: Number of constraints
+    :return: (specs, animated, drivens), specs in matrixConstraintBatch form, animated the nodes to key
+    '''
+    from maya import cmds
+
+    def transform(name):
+        return cmds.createNode('transform', n=name, skipSelect=True)
+
+    specs = []
+    if shape == 'chain':
+        previous = transform('benchRoot')
+        animated = [previous]
+        for i in range(count):
+            driven = transform('benchDriven_%d' % i)
+            cmds.setAttr(driven + '.translateX', 1.0)
+            specs.append(([previous], driven, constraintType, 'all', True, None, None))
+            previous = driven
+    elif shape == 'fanIn':
+        animated = []
+        for i in range(count):
+            driverNodes = [transform('benchDriver_%d_%d' % (i, d)) for d in range(drivers)]
+            animated += driverNodes
+            specs.append((driverNodes, transform('benchDriven_%d' % i), constraintType, 'all', True, None, None))
+    elif shape == 'fanOut':
+        animated = [transform('benchRoot')]
+        specs = [(animated, transform('benchDriven_%d' % i), constraintType, 'all', True, None, None)
+                 for i in range(count)]
+    else:
+        raise ValueError("shape must be one of %s, got %r." % (', '.join(SHAPES), shape))
+    return specs, animated, [spec[1] for spec in specs]
+
+
+def _animate(nodes, frames):
+    from maya import cmds
+
+    for i, node in enumerate(nodes):
+        cmds.setKeyframe(node, attribute='translateX', time=0, value=0.0)
+        cmds.setKeyframe(node, attribute='translateX', time=frames, value=10.0 + i % 7)
+        cmds.setKeyframe(node, attribute='rotateY', time=0, value=0.0)
+        cmds.setKeyframe(node, attribute='rotateY', time=frames, value=90.0)
+        cmds.setKeyframe(node, attribute='scaleZ', time=0, value=1.0)
+        cmds.setKeyframe(node, attribute='scaleZ', time=frames, value=2.0)
+
+
+def _build(method, specs):
+    '''Seconds taken to constrain every spec with method'''
+    from maya import cmds
+    from MatrixConstraint.MatrixConstraint import matrixConstraintBatch
+
+    start = time.time()
+    if method == 'matrixConstraint':
+        matrixConstraintBatch(specs, backend='api')
+    else:
+        for drivers, driven, constraintType, _, maintainOffset, _, _ in specs:
+            getattr(cmds, constraintType + 'Constraint')(drivers + [driven], maintainOffset=maintainOffset)
+    return time.time() - start
+
+
+def _fileBytes():
+    '''Size of the current scene saved as Maya ASCII'''
+    from maya import cmds
+
+    handle, path = tempfile.mkstemp(suffix='.ma')
+    os.close(handle)
+    try:
+        cmds.file(rename=path)
+        cmds.file(save=True, type='mayaAscii', force=True)
+        return os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+
+def _playback(drivens, frames):
+    '''
+    Frames per second over the range. An interactive session times cmds.play with every frame played once. Playback
+    does nothing in a batch session, there every frame is a time change, which the evaluation manager evaluates the
+    animated graph on, and a single worldMatrix pull of the last driven, the end of a chain rig.
+
+    :return: (fps, 'play' or 'currentTime')
+    '''
+    from maya import cmds
+
+    if not cmds.about(batch=True):
+        options = dict((flag, cmds.playbackOptions(query=True, **{flag: True}))
+                       for flag in ('minTime', 'maxTime', 'playbackSpeed', 'maxPlaybackSpeed', 'loop'))
+        cmds.playbackOptions(minTime=0, maxTime=frames - 1, playbackSpeed=0, maxPlaybackSpeed=0, loop='once')
+        cmds.currentTime(0)
+        try:
+            start = time.time()
+            cmds.play(wait=True)
+            return frames / max(time.time() - start, 1.0e-9), 'play'
+        finally:
+            cmds.playbackOptions(**options)
+    plug = drivens[-1] + '.worldMatrix[0]'
+    start = time.time()
+    for frame in range(frames):
+        cmds.currentTime(frame, update=True)
+        cmds.getAttr(plug)
+    return frames / max(time.time() - start, 1.0e-9), 'currentTime'
+
+
+def measure(shape, constraintType, method, count, frames=100, drivers=4):
+    '''
+    :return: dict with the build seconds, added nodes, Maya ASCII file size and playback fps of one rig, playback
+          naming how the frames were driven, see _playback
+    '''
+    from maya import cmds
+
+    cmds.file(new=True, force=True)
+    specs, animated, drivens = rigSpecs(shape, count, constraintType, drivers)
+    _animate(animated, frames)
+    nodes = len(cmds.ls())
+    build = _build(method, specs)
+    fileBytes = _fileBytes()
+    fps, playback = _playback(drivens, frames)
+    return {'shape': shape,
+            'type': constraintType,
+            'method': method,
+            'count': count,
+            'drivers': drivers if shape == 'fanIn' else 1,
+            'frames': frames,
+            'buildSeconds': build,
+            'nodes': len(cmds.ls()) - nodes,
+            'fileBytes': fileBytes,
+            'playbackFps': fps,
+            'playback': playback,
+            'maya': cmds.about(version=True)}
+
+
+def _csv(value):
+    return [item for item in value.split(',') if item]
+
+
+def main(argv=None):
+    from MatrixConstraint.MatrixConstraint import CONSTRAINT_TYPES
+
+    parser = argparse.ArgumentParser(description="Matrix constraints versus native constraints.")
+    parser.add_argument('--counts', type=lambda value: [int(item) for item in _csv(value)], default=list(COUNTS))
+    parser.add_argument('--shapes', type=_csv, default=list(SHAPES))
+    parser.add_argument('--types', type=_csv, default=list(CONSTRAINT_TYPES))
+    parser.add_argument('--methods', type=_csv, default=list(METHODS))
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--drivers', type=int, default=4)
+    parser.add_argument('--output', help="JSON-lines file the results are appended to")
+    args = parser.parse_args(argv)
+
+    import maya.standalone
+    maya.standalone.initialize()
+
+    stream = open(args.output, 'a') if args.output else None
+    try:
+        for count in args.counts:
+            for shape in args.shapes:
+                for constraintType in args.types:
+                    for method in args.methods:
+                        line = json.dumps(measure(shape, constraintType, method, count, args.frames, args.drivers))
+                        print(line)
+                        if stream is not None:
+                            stream.write(line + '\n')
+                            stream.flush()
+    finally:
+        if stream is not None:
+            stream.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
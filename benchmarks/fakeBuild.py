@@ -0,0 +1,97 @@
+'''
+    File name: fakeBuild.py
+    Python Version: 2.7
+    Builds weighted three driver maintainOffset parent constraints on the in-memory FakeDG and checks them
+    numerically, so builder overhead and correctness can be tracked on a host without Maya. Run it with a plain
+    interpreter and NumPy:
+
+        python -m MatrixConstraint.benchmarks.fakeBuild [count]
+
+    Prints one JSON record per recipe and output and exits non zero when a driven does not hold its offset.
+    The checks in tests/ assert the rest of the builder on the same FakeDG.
+'''
+
+import json
+import sys
+import time
+
+TOLERANCE = 1.0e-6
+# Driver weights per driven, every recipe blends or picks between this many drivers
+WEIGHTS = (0.5, 0.3, 0.2)
+
+
+def _scene(dg, count):
+    '''Drivers under one rig transform and drivens in scattered poses, returns (rig, specs, drivens)'''
+    rig = dg.createNode('transform', n='benchRig')
+    specs, drivens = [], []
+    for i in range(count):
+        drivers = []
+        for j in range(len(WEIGHTS)):
+            driver = dg.createNode('transform', n='benchDriver_%d_%d' % (i, j), p=rig)
+            dg.setAttr(driver + '.translate', i, j, -2.0)
+            dg.setAttr(driver + '.rotate', 7.0 * i, 30.0 * j, -15.0)
+            drivers.append(driver)
+        driven = dg.createNode('transform', n='benchDriven_%d' % i)
+        dg.setAttr(driven + '.translate', 0.5, i, 3.0)
+        dg.setAttr(driven + '.rotate', 0.0, -3.0 * i, 45.0)
+        specs.append((drivers, driven, 'parent', 'all', True, list(WEIGHTS), None))
+        drivens.append(driven)
+    return rig, specs, drivens
+
+
+def _error(dg, drivens, expected):
+    '''Largest difference between each driven world matrix and its expected world matrix'''
+    import numpy as np
+
+    return max(float(np.abs(dg.worldMatrix(driven) - matrix).max()) for driven, matrix in zip(drivens, expected))
+
+
+def measure(dg, recipe, output, count=100):
+    '''
+    Moving the rig moves every driver by the same world space delta, so whichever way a recipe blends or picks its
+    drivers the driven has to follow by that delta too.
+
+    :return: dict with build time, node count and the largest error at the rest pose and after moving the rig
+    '''
+    import numpy as np
+    from MatrixConstraint.MatrixConstraint import matrixConstraintBatch
+
+    dg.reset()
+    rig, specs, drivens = _scene(dg, count)
+    rest = [dg.worldMatrix(driven) for driven in drivens]
+    nodes = dg.nodeCount()
+
+    start = time.time()
+    matrixConstraintBatch(specs, output=output, recipe=recipe)
+    build = time.time() - start
+
+    restError = _error(dg, drivens, rest)
+    rigRest = dg.worldMatrix(rig)
+    dg.setAttr(rig + '.translate', -1.0, 4.0, 2.0)
+    dg.setAttr(rig + '.rotate', 90.0, 0.0, 12.0)
+    delta = np.matmul(np.linalg.inv(rigRest), dg.worldMatrix(rig))
+    return {'recipe': recipe,
+            'output': output,
+            'count': count,
+            'nodesPerConstraint': (dg.nodeCount() - nodes) / float(count),
+            'buildSeconds': build,
+            'restError': restError,
+            'movedError': _error(dg, drivens, [np.matmul(matrix, delta) for matrix in rest])}
+
+
+def main(count=100):
+    from MatrixConstraint import MatrixConstraintFakeDG
+    dg = MatrixConstraintFakeDG.install()
+    from MatrixConstraint.MatrixConstraint import OUTPUTS, RECIPES
+
+    failed = False
+    for recipe in RECIPES:
+        for output in OUTPUTS:
+            result = measure(dg, recipe, output, count)
+            failed = failed or max(result['restError'], result['movedError']) > TOLERANCE
+            print(json.dumps(result))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*[int(arg) for arg in sys.argv[1:2]]))
@@ -0,0 +1,53 @@
+'''
+    File name: importTime.py
+    Python Version: 2.7
+    Measures how long a fresh interpreter takes to import MatrixConstraint.MatrixConstraint and checks that neither
+    pymel.core nor a Qt binding was pulled in on the way. Run it with mayapy so maya.cmds is importable:
+
+        mayapy -m MatrixConstraint.benchmarks.importTime [budgetSeconds]
+
+    Prints a JSON result and exits non zero when the import is over budget or loads a heavy module.
+'''
+
+import json
+import os
+import subprocess
+import sys
+
+# Modules that must only be loaded on demand
+HEAVY_MODULES = ('pymel.core', 'PySide2', 'PySide6', 'PyQt5', 'MatrixConstraint.Qt')
+DEFAULT_BUDGET = 0.5
+
+_PROBE = '''
+import json, sys, time
+start = time.time()
+import MatrixConstraint.MatrixConstraint
+elapsed = time.time() - start
+print(json.dumps({'seconds': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+''' % (HEAVY_MODULES,)
+
+
+def measureImportTime(executable=None):
+    '''
+    Imports the builder in a clean child interpreter so nothing already loaded in this process skews the timing.
+
+    :param executable: Interpreter to run, defaults to the current one
+    :return: dict with the import 'seconds' and the heavy modules that were 'loaded'
+    '''
+    packageRoot = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([packageRoot] + [p for p in [env.get('PYTHONPATH')] if p])
+    output = subprocess.check_output([executable or sys.executable, '-c', _PROBE], env=env)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def main(budget=DEFAULT_BUDGET):
+    result = measureImportTime()
+    result['budget'] = budget
+    result['ok'] = result['seconds'] <= budget and not result['loaded']
+    print(json.dumps(result))
+    return 0 if result['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(*[float(arg) for arg in sys.argv[1:2]]))
@@ -0,0 +1,90 @@
+'''
+    File name: recipeEval.py
+    Python Version: 2.7
+    Compares the per-constraint evaluation cost of each network recipe and output mode. Builds count parent
+    constraints with animated drivers, then pulls every driven worldMatrix across a frame range and subtracts the
+    cost of the same pulls on an unconstrained scene. Run it with mayapy:
+
+        mayapy -m MatrixConstraint.benchmarks.recipeEval [count] [frames] [drivers]
+
+    Prints one JSON record per recipe and output.
+'''
+
+import json
+import sys
+import time
+
+
+def _scene(count, drivers, frames):
+    '''New scene with count drivens and count * drivers animated drivers, returns (specs, drivens)'''
+    from maya import cmds
+
+    cmds.file(new=True, force=True)
+    specs, drivens = [], []
+    for i in range(count):
+        driverNodes = []
+        for d in range(drivers):
+            node = cmds.createNode('transform', n='benchDriver_%d_%d' % (i, d))
+            cmds.setKeyframe(node, attribute='translateX', time=0, value=0.0)
+            cmds.setKeyframe(node, attribute='translateX', time=frames, value=10.0 + d)
+            cmds.setKeyframe(node, attribute='rotateY', time=0, value=0.0)
+            cmds.setKeyframe(node, attribute='rotateY', time=frames, value=90.0 * (d + 1))
+            driverNodes.append(node)
+        driven = cmds.createNode('transform', n='benchDriven_%d' % i)
+        specs.append((driverNodes, driven, 'parent', 'all'))
+        drivens.append(driven)
+    return specs, drivens
+
+
+def _pull(drivens, frames):
+    '''Seconds spent evaluating every driven worldMatrix on each frame'''
+    from maya import cmds
+
+    start = time.time()
+    for frame in range(frames):
+        cmds.currentTime(frame, update=False)
+        for driven in drivens:
+            cmds.getAttr(driven + '.worldMatrix[0]')
+    return time.time() - start
+
+
+def measure(recipe, output, count=1000, frames=100, drivers=2):
+    '''
+    :return: dict with build time, evaluation time per frame and evaluation cost per constraint in microseconds
+    '''
+    from maya import cmds
+    from MatrixConstraint.MatrixConstraint import matrixConstraintBatch
+
+    specs, drivens = _scene(count, drivers, frames)
+    baseline = _pull(drivens, frames)
+
+    start = time.time()
+    matrixConstraintBatch(specs, backend='api', output=output, recipe=recipe)
+    build = time.time() - start
+    nodes = len(cmds.ls(type=['wtAddMatrix', 'blendMatrix', 'multMatrix', 'decomposeMatrix', 'pickMatrix']))
+
+    evaluation = _pull(drivens, frames) - baseline
+    return {'recipe': recipe,
+            'output': output,
+            'count': count,
+            'frames': frames,
+            'drivers': drivers,
+            'matrixNodes': nodes,
+            'buildSeconds': build,
+            'evalSecondsPerFrame': evaluation / frames,
+            'microsecondsPerConstraint': evaluation / frames / count * 1.0e6}
+
+
+def main(count=1000, frames=100, drivers=2):
+    import maya.standalone
+    maya.standalone.initialize()
+    from MatrixConstraint.MatrixConstraint import OUTPUTS, RECIPES
+
+    for recipe in RECIPES:
+        for output in OUTPUTS:
+            print(json.dumps(measure(recipe, output, count, frames, drivers)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*[int(arg) for arg in sys.argv[1:4]]))
@@ -0,0 +1,74 @@
+'''
+    File name: fakeScene.py
+    Python Version: 2.7
+    Shared setup of the checks in this package. Importing it installs the in-memory FakeDG in place of Maya, so the
+    checks run with a plain interpreter and NumPy on a CI host without a Maya licence. From the directory holding the
+    MatrixConstraint package:
+
+        python -m unittest discover -s MatrixConstraint/tests -t .
+        python -m pytest MatrixConstraint/tests
+
+    The UI checks are skipped unless a Qt binding is installed, set QT_QPA_PLATFORM=offscreen on a host without a
+    display.
+'''
+
+import unittest
+
+import numpy as np
+
+from MatrixConstraint import MatrixConstraintFakeDG
+
+TOLERANCE = 1.0e-6
+
+dg = MatrixConstraintFakeDG.fakeDG() or MatrixConstraintFakeDG.install(force=True)
+
+
+class FakeCase(unittest.TestCase):
+    '''Starts every check on an empty scene with two posed drivers and a driven under a posed parent'''
+
+    def setUp(self):
+        dg.reset()
+        self.rig = dg.createNode('transform', n='rig')
+        self.drivers = [dg.createNode('transform', n='driverA', p=self.rig),
+                        dg.createNode('transform', n='driverB', p=self.rig)]
+        group = dg.createNode('transform', n='group')
+        self.driven = dg.createNode('transform', n='driven', p=group)
+        dg.setAttr('driverA.translate', 1.0, 2.0, 3.0)
+        dg.setAttr('driverA.rotate', 10.0, 20.0, 30.0)
+        dg.setAttr('driverB.translate', -4.0, 0.5, 1.0)
+        dg.setAttr('driverB.rotate', 0.0, -45.0, 15.0)
+        dg.setAttr('group.translate', 0.0, 3.0, 0.0)
+        dg.setAttr('group.rotate', 0.0, 30.0, 0.0)
+        dg.setAttr('driven.translate', 2.0, -1.0, 0.5)
+        dg.setAttr('driven.rotate', 5.0, 0.0, -25.0)
+
+    def assertMatrix(self, actual, expected):
+        self.assertLess(float(np.abs(np.asarray(actual) - np.asarray(expected)).max()), TOLERANCE)
+
+    def animate(self, plug, keys):
+        '''Keys plug with (frame, value) pairs in UI units, linear in between'''
+        from maya.api import OpenMaya as om
+        from maya.api import OpenMayaAnim as oma
+
+        selList = om.MSelectionList()
+        selList.add(plug)
+        curveFn = oma.MFnAnimCurve()
+        curveFn.create(selList.getPlug(0))
+        angle = '.rotate' in plug
+        curveFn.addKeys(om.MTimeArray([om.MTime(frame) for frame, _ in keys]),
+                        om.MDoubleArray([np.radians(value) if angle else value for _, value in keys]))
+
+    def worldMatrices(self, node, frames):
+        '''World matrices of node at each frame'''
+        matrices = []
+        for frame in frames:
+            dg.currentTime(frame)
+            matrices.append(dg.worldMatrix(node))
+        return matrices
+
+    def moveRig(self):
+        '''Moves both drivers by one world space delta, returns where the driven has to end up'''
+        rest, rigRest = dg.worldMatrix(self.driven), dg.worldMatrix(self.rig)
+        dg.setAttr('rig.translate', 3.0, -2.0, 1.0)
+        dg.setAttr('rig.rotate', 40.0, 0.0, -70.0)
+        return np.matmul(rest, np.matmul(np.linalg.inv(rigRest), dg.worldMatrix(self.rig)))
@@ -0,0 +1,45 @@
+from MatrixConstraint.tests.fakeScene import FakeCase, dg
+
+from MatrixConstraint.MatrixConstraint import OUTPUTS, bakeMatrixConstraint, matrixConstraint
+
+FRAMES = range(1, 6)
+
+
+class BakeChecks(FakeCase):
+
+    def setUp(self):
+        super(BakeChecks, self).setUp()
+        self.animate('rig.translateX', [(1, 0.0), (5, 4.0)])
+        self.animate('rig.rotateY', [(1, 0.0), (5, 90.0)])
+
+    def test_keysKeepTheMotion(self):
+        for output in OUTPUTS:
+            self.setUp()
+            matrixConstraint(self.drivers + [self.driven], parent=True, all=True, maintainOffset=True,
+                             output=output)
+            expected = self.worldMatrices(self.driven, FRAMES)
+            curves = bakeMatrixConstraint(self.driven, startFrame=FRAMES[0], endFrame=FRAMES[-1])
+            self.assertEqual(len(curves), 6)
+            self.assertEqual(dg.listRelatives(self.driven, children=True), None)
+            for actual, wanted in zip(self.worldMatrices(self.driven, FRAMES), expected):
+                self.assertMatrix(actual, wanted)
+
+    def test_keepsTypesNotBaked(self):
+        settings = matrixConstraint(self.drivers + [self.driven], point=True, orient=True, all=True,
+                                    maintainOffset=True)
+        curves = bakeMatrixConstraint(self.driven, types=['orient'], startFrame=FRAMES[0], endFrame=FRAMES[-1])
+        self.assertEqual(len(curves), 3)
+        self.assertEqual(dg.getAttr(settings[0] + '.constraintTypes'), 'point')
+        self.assertTrue(dg.listConnections('driven.translate', s=True, d=False, type='decomposeMatrix'))
+
+    def test_undoRestoresTheNetwork(self):
+        settings = matrixConstraint(self.drivers + [self.driven], parent=True, all=True, maintainOffset=True)
+        nodes = dg.nodeCount()
+        expected = self.worldMatrices(self.driven, FRAMES)
+        bakeMatrixConstraint(self.driven, startFrame=FRAMES[0], endFrame=FRAMES[-1])
+        dg.undo()
+        self.assertEqual(dg.nodeCount(), nodes)
+        self.assertTrue(dg.objExists(settings[0]))
+        self.assertEqual(dg.nodeCount('animCurveTL'), 1)
+        for actual, wanted in zip(self.worldMatrices(self.driven, FRAMES), expected):
+            self.assertMatrix(actual, wanted)
@@ -0,0 +1,93 @@
+from MatrixConstraint.tests.fakeScene import FakeCase, dg
+
+from MatrixConstraint.MatrixConstraint import (BACKENDS, CONSTRAINT_TYPES, OUTPUTS, RECIPES, matrixConstraint,
+                                               matrixConstraintBatch, suspendUpdates)
+
+
+class BuildChecks(FakeCase):
+
+    def test_maintainOffsetFollowsDrivers(self):
+        for backend in BACKENDS:
+            for recipe in RECIPES:
+                for output in OUTPUTS:
+                    self.setUp()
+                    rest = dg.worldMatrix(self.driven)
+                    settings = matrixConstraintBatch([(self.drivers, self.driven, 'parent', 'all', True)],
+                                                     backend=backend, output=output, recipe=recipe)
+                    self.assertEqual(len(settings), 1)
+                    self.assertEqual(dg.getAttr(settings[0] + '.constraintTypes'), 'parent')
+                    self.assertMatrix(dg.worldMatrix(self.driven), rest)
+                    expected = self.moveRig()
+                    self.assertMatrix(dg.worldMatrix(self.driven), expected)
+
+    def test_backendsBuildTheSameNetwork(self):
+        networks = []
+        for backend in BACKENDS:
+            self.setUp()
+            matrixConstraintBatch([(self.drivers, self.driven, 'point', 'all', True, [0.25, 0.75]),
+                                   (self.drivers, self.driven, 'orient', 'xz', False, [0.25, 0.75])],
+                                  backend=backend)
+            networks.append((sorted(dg.ls()), sorted(dg.listConnections(self.driven, s=True, d=False, c=True,
+                                                                        p=True))))
+        self.assertEqual(networks[0], networks[1])
+
+    def test_typesShareOneNetwork(self):
+        for backend in BACKENDS:
+            self.setUp()
+            first = matrixConstraint(self.drivers + [self.driven], point=True, all=True, backend=backend)
+            second = matrixConstraint(self.drivers + [self.driven], orient=True, x=True, backend=backend)
+            self.assertEqual(first, second)
+            self.assertEqual(dg.getAttr(first[0] + '.constraintTypes'), 'point orient')
+            self.assertTrue(dg.listConnections('driven.rotateX', s=True, d=False))
+            self.assertFalse(dg.listConnections('driven.rotateY', s=True, d=False))
+
+    def test_undoRemovesTheBuild(self):
+        for backend in BACKENDS:
+            self.setUp()
+            nodes = dg.nodeCount()
+            rest = dg.worldMatrix(self.driven)
+            matrixConstraintBatch([(self.drivers, self.driven, constraintType, 'all', True)
+                                   for constraintType in CONSTRAINT_TYPES], backend=backend)
+            self.assertGreater(dg.nodeCount(), nodes)
+            dg.undo()
+            self.assertEqual(dg.nodeCount(), nodes)
+            self.assertFalse(dg.listConnections(self.driven, s=True, d=False))
+            self.assertMatrix(dg.worldMatrix(self.driven), rest)
+
+    def test_selectionIsKept(self):
+        dg.select(self.drivers + [self.driven])
+        matrixConstraint(parent=True, all=True)
+        self.assertEqual(dg.ls(sl=True), self.drivers + [self.driven])
+
+    def test_badArguments(self):
+        with self.assertRaises(ValueError):
+            matrixConstraint([self.driven], parent=True, all=True)
+        with self.assertRaises(ValueError):
+            matrixConstraint(self.drivers + [self.driven], parent=True)
+
+    def test_inactiveSuspendLetsInnerOnesSuspend(self):
+        with suspendUpdates(active=False):
+            self.assertEqual(dg.evaluationManager(query=True, mode=True), ['parallel'])
+            with suspendUpdates():
+                self.assertEqual(dg.evaluationManager(query=True, mode=True), ['off'])
+                with suspendUpdates():
+                    pass
+                self.assertEqual(dg.evaluationManager(query=True, mode=True), ['off'])
+            self.assertEqual(dg.evaluationManager(query=True, mode=True), ['parallel'])
+
+    def test_overlappingTypeLeavesTheOldChain(self):
+        for backend in BACKENDS:
+            self.setUp()
+            old = matrixConstraintBatch([([self.drivers[0]], self.driven, 'point', 'all', True),
+                                         ([self.drivers[0]], self.driven, 'scale', 'all', True)], backend=backend)[0]
+            new = matrixConstraintBatch([([self.drivers[1]], self.driven, 'parent', 'all', True)], backend=backend)[0]
+            self.assertEqual(dg.getAttr(old + '.constraintTypes'), 'scale')
+            self.assertEqual(dg.getAttr(new + '.constraintTypes'), 'parent')
+            rest = dg.worldMatrix(self.driven)
+            dg.setAttr('driverA.translate', 9.0, 9.0, 9.0)
+            self.assertMatrix(dg.worldMatrix(self.driven), rest)
+
+    def test_overlappingTypesInOneBatch(self):
+        with self.assertRaises(ValueError):
+            matrixConstraintBatch([([self.drivers[0]], self.driven, 'point', 'all', True),
+                                   ([self.drivers[1]], self.driven, 'parent', 'all', True)])
@@ -0,0 +1,43 @@
+from MatrixConstraint.tests.fakeScene import FakeCase, dg
+
+from MatrixConstraint.MatrixConstraint import matrixConstraint, removeMatrixConstraint
+from MatrixConstraint.MatrixConstraintIndex import ConstraintIndex
+
+
+class IndexChecks(FakeCase):
+
+    def setUp(self):
+        super(IndexChecks, self).setUp()
+        self.index = ConstraintIndex()
+        self.index.install()
+
+    def tearDown(self):
+        self.index.uninstall()
+
+    def test_followsBuildsAndRemovals(self):
+        self.assertEqual(self.index.networks(), [])
+        settings = matrixConstraint(self.drivers + [self.driven], parent=True, all=True, backend='api')
+        self.assertEqual(self.index.constrainedBy(self.driven), settings)
+        self.assertEqual(self.index.drivenBy('driverB'), ['|group|driven'])
+        network = self.index.network(settings[0])
+        self.assertEqual(network['drivers'], ['|rig|driverA', '|rig|driverB'])
+        self.assertTrue(network['nodes'])
+        removeMatrixConstraint([self.driven])
+        self.assertEqual(self.index.constrainedBy(self.driven), [])
+        self.assertEqual(self.index.drivenBy('driverA'), [])
+
+    def test_undoAndNewScene(self):
+        matrixConstraint(self.drivers + [self.driven], point=True, all=True)
+        self.assertEqual(len(self.index.networks()), 1)
+        dg.undo()
+        self.assertEqual(self.index.networks(), [])
+        matrixConstraint(self.drivers + [self.driven], point=True, all=True)
+        self.assertEqual(len(self.index.networks()), 1)
+        self.setUp()
+        self.assertEqual(self.index.networks(), [])
+
+    def test_followsRenames(self):
+        settings = matrixConstraint(self.drivers + [self.driven], orient=True, all=True)
+        dg.rename('driverA', 'leader')
+        self.assertEqual(self.index.drivenBy('leader'), ['|group|driven'])
+        self.assertEqual(self.index.network(settings[0])['drivers'], ['|rig|leader', '|rig|driverB'])
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+
+from MatrixConstraint.tests.fakeScene import FakeCase, dg
+
+from MatrixConstraint.MatrixConstraint import (BACKENDS, RECIPES, matrixConstraint, matrixConstraintBatch,
+                                               removeMatrixConstraint)
+from MatrixConstraint.MatrixConstraintIO import exportMatrixConstraints, importMatrixConstraints
+
+
+class ExportChecks(FakeCase):
+
+    def setUp(self):
+        super(ExportChecks, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'constraints.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_roundTrip(self):
+        for backend in BACKENDS:
+            for recipe in RECIPES:
+                FakeCase.setUp(self)
+                matrixConstraintBatch([(self.drivers, self.driven, 'parent', 'all', True, [0.25, 0.75])],
+                                      backend=backend, recipe=recipe)
+                self.assertEqual(exportMatrixConstraints(self.path), 1)
+                removeMatrixConstraint([self.driven], preservePose=False, backend=backend)
+                self.assertEqual(importMatrixConstraints(self.path, backend=backend), 1)
+                expected = self.moveRig()
+                self.assertMatrix(dg.worldMatrix(self.driven), expected)
+
+    def test_failingImportRollsBack(self):
+        '''The second record's driver is gone, the first record's network must not outlive the import'''
+        lost = dg.createNode('transform', n='lost')
+        other = dg.createNode('transform', n='other')
+        matrixConstraintBatch([(self.drivers, self.driven, 'parent', 'all', True),
+                               ([lost], other, 'point', 'all', True)])
+        self.assertEqual(exportMatrixConstraints(self.path), 2)
+        removeMatrixConstraint([self.driven, other], preservePose=False)
+        dg.delete(lost)
+        nodes = dg.nodeCount()
+        for state in (True, False):
+            dg.undoInfo(stateWithoutFlush=state)
+            with self.assertRaises(ValueError):
+                importMatrixConstraints(self.path, chunkSize=1)
+            self.assertEqual(dg.nodeCount(), nodes)
+        dg.undoInfo(stateWithoutFlush=True)
+
+    def test_exportFindsNetworksByName(self):
+        '''Networks built before constraintTypes was recorded only carry their type in the settings name'''
+        settings = matrixConstraint(self.drivers + [self.driven], parent=True, all=True, maintainOffset=True)[0]
+        dg.setAttr(settings + '.constraintTypes', lock=False)
+        dg.deleteAttr(settings + '.constraintTypes')
+        self.assertEqual(exportMatrixConstraints(self.path), 1)
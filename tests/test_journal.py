@@ -0,0 +1,41 @@
+from MatrixConstraint.tests.fakeScene import FakeCase, dg
+
+from MatrixConstraint.MatrixConstraint import matrixConstraint, matrixConstraintBatch, removeMatrixConstraint
+from MatrixConstraint.MatrixConstraintJournal import journaledBuild
+
+
+class JournalChecks(FakeCase):
+
+    def test_failureRollsBackTheBlock(self):
+        existing = matrixConstraint(self.drivers[:1] + [self.driven], parent=True, all=True, maintainOffset=True)
+        nodes, rest = dg.nodeCount(), dg.worldMatrix(self.driven)
+        with self.assertRaises(ValueError):
+            with journaledBuild():
+                matrixConstraint(self.drivers + [self.driven], parent=True, all=True, maintainOffset=True)
+                matrixConstraint(self.drivers + [self.driven], parent=True)
+        self.assertTrue(dg.undoInfo(query=True, state=True))
+        self.assertEqual(dg.nodeCount(), nodes)
+        self.assertTrue(dg.objExists(existing[0]))
+        self.assertEqual(dg.getAttr(existing[0] + '.constraintTypes'), 'parent')
+        self.assertMatrix(dg.worldMatrix(self.driven), rest)
+
+    def test_successKeepsTheBuild(self):
+        with journaledBuild():
+            settings = matrixConstraint(self.drivers + [self.driven], point=True, all=True)
+        self.assertTrue(dg.objExists(settings[0]))
+        self.assertEqual(dg.getAttr(settings[0] + '.constraintTypes'), 'point')
+
+    def test_failureUndoesCommittedModifiers(self):
+        other = dg.createNode('transform', n='other')
+        matrixConstraintBatch([(self.drivers, other, 'point', 'all', True)])
+        nodes, rest = dg.nodeCount(), dg.worldMatrix(self.driven)
+        with self.assertRaises(ValueError):
+            with journaledBuild():
+                matrixConstraintBatch([(self.drivers, self.driven, 'parent', 'all', True)])
+                removeMatrixConstraint([other])
+                matrixConstraintBatch([(self.drivers, self.driven, 'orient', '', True)])
+        self.assertEqual(dg.nodeCount(), nodes)
+        self.assertFalse(dg.listConnections(self.driven, s=True, d=False))
+        self.assertEqual(dg.getAttr('other_point_ConstraintSettings.constraintTypes'), 'point')
+        self.assertTrue(dg.listConnections('other.translate', s=True, d=False))
+        self.assertMatrix(dg.worldMatrix(self.driven), rest)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from MatrixConstraint.tests.fakeScene import TOLERANCE, FakeCase, dg
+
+from MatrixConstraint.MatrixConstraint import BACKENDS, OUTPUTS, matrixConstraint, removeMatrixConstraint
+
+
+class RemoveChecks(FakeCase):
+
+    def test_preservePose(self):
+        for backend in BACKENDS:
+            for output in OUTPUTS:
+                self.setUp()
+                matrixConstraint(self.drivers + [self.driven], parent=True, all=True, maintainOffset=True,
+                                 output=output)
+                expected = self.moveRig()
+                deleted = removeMatrixConstraint([self.driven], backend=backend)
+                self.assertTrue(deleted)
+                self.assertFalse(any(dg.objExists(node) for node in deleted))
+                self.assertMatrix(dg.worldMatrix(self.driven), expected)
+
+    def test_keepsRemainingTypes(self):
+        for backend in BACKENDS:
+            for output in OUTPUTS:
+                self.setUp()
+                matrixConstraint(self.drivers + [self.driven], point=True, orient=True, all=True,
+                                 maintainOffset=True, output=output)
+                expected = self.moveRig()
+                removeMatrixConstraint([self.driven], types=['point'], backend=backend)
+                self.assertMatrix(dg.worldMatrix(self.driven), expected)
+                dg.setAttr('rig.translate', 0.0, 0.0, 0.0)
+                dg.setAttr('rig.rotate', 0.0, 90.0, 0.0)
+                if output == 'trs':
+                    # An offsetParentMatrix orient also turns the freed local translate
+                    self.assertMatrix(dg.worldMatrix(self.driven)[3], expected[3])
+                self.assertGreater(float(np.abs(dg.worldMatrix(self.driven) - expected).max()), TOLERANCE)
+
+    def test_undoRestoresTheNetwork(self):
+        for backend in BACKENDS:
+            self.setUp()
+            settings = matrixConstraint(self.drivers + [self.driven], parent=True, all=True, maintainOffset=True)
+            removeMatrixConstraint([self.driven], backend=backend)
+            dg.undo()
+            self.assertTrue(dg.objExists(settings[0]))
+            expected = self.moveRig()
+            self.assertMatrix(dg.worldMatrix(self.driven), expected)
@@ -0,0 +1,48 @@
+import numpy as np
+
+from MatrixConstraint.tests.fakeScene import FakeCase, dg
+
+from MatrixConstraint.MatrixConstraint import matrixConstraint, switchSpace
+
+FRAMES = range(1, 8)
+
+
+class SpaceChecks(FakeCase):
+
+    def setUp(self):
+        super(SpaceChecks, self).setUp()
+        self.animate('driverB.translateY', [(1, 0.0), (7, 6.0)])
+        self.animate('driverB.rotateZ', [(1, 0.0), (7, 60.0)])
+        self.settings = matrixConstraint(self.drivers + [self.driven], parent=True, all=True, maintainOffset=True,
+                                         recipe='spaceSwitch', output='offsetParentMatrix')[0]
+        self.animate('driven.translateX', [(1, 0.0), (7, 3.0)])
+
+    def spaces(self):
+        return [dg.getAttr(self.settings + '.space', time=frame) for frame in FRAMES]
+
+    def test_switchKeepsTheMotion(self):
+        switched = range(3, 6)
+        expected = self.worldMatrices(self.driven, switched)
+        curves = switchSpace(self.driven, np.int64(1), startFrame=switched[0], endFrame=switched[-1])
+        self.assertEqual(len(curves), 7)
+        self.assertEqual(self.spaces(), [0, 0, 1, 1, 1, 0, 0])
+        for actual, wanted in zip(self.worldMatrices(self.driven, switched), expected):
+            self.assertMatrix(actual, wanted)
+
+    def test_undoRestoresCurvesAndKeys(self):
+        nodes = dg.nodeCount()
+        expected = self.worldMatrices(self.driven, FRAMES)
+        local = dg.getAttr('driven.translateX', time=4)
+        switchSpace(self.driven, 'driverB', startFrame=3, endFrame=5)
+        self.assertGreater(dg.nodeCount(), nodes)
+        dg.undo()
+        self.assertEqual(dg.nodeCount(), nodes)
+        self.assertEqual(self.spaces(), [0] * len(FRAMES))
+        self.assertEqual(dg.getAttr('driven.translateX', time=4), local)
+        for actual, wanted in zip(self.worldMatrices(self.driven, FRAMES), expected):
+            self.assertMatrix(actual, wanted)
+
+    def test_badSpaces(self):
+        for space in (True, 2, 'rig'):
+            with self.assertRaises(ValueError):
+                switchSpace(self.driven, space, startFrame=3, endFrame=5)
@@ -0,0 +1,52 @@
+import unittest
+
+from MatrixConstraint.tests.fakeScene import FakeCase, dg
+
+try:
+    from MatrixConstraint.Qt import QtWidgets
+except ImportError:
+    QtWidgets = None
+
+
+@unittest.skipIf(QtWidgets is None, 'no Qt binding installed')
+class UIChecks(FakeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.application = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    def setUp(self):
+        super(UIChecks, self).setUp()
+        from MatrixConstraint.MatrixConstraintUI import MatrixConstraintUI
+        self.dialog = MatrixConstraintUI()
+        self.buttons = dict((button.text(), button) for button in self.dialog.findChildren(QtWidgets.QPushButton))
+        dg.select(self.drivers + [self.driven])
+
+    def tearDown(self):
+        self.dialog.deleteLater()
+
+    def test_buttonsBuildTheirType(self):
+        for label, constraintType in (('Parent Matrix', 'parent'), ('Point Matrix', 'point'),
+                                      ('Orient Matrix', 'orient'), ('Scale Matrix', 'scale')):
+            self.setUp()
+            getattr(self.dialog, constraintType + 'Check').setChecked(True)
+            self.dialog.maintainOffsetBtn.setChecked(True)
+            rest = dg.worldMatrix(self.driven)
+            self.buttons[label].click()
+            settings = dg.listRelatives(self.driven, children=True, type='transform')
+            self.assertEqual(settings, ['driven_%s_ConstraintSettings' % constraintType])
+            self.assertMatrix(dg.worldMatrix(self.driven), rest)
+
+    def test_axisBoxesClearAll(self):
+        self.dialog.pointCheck.setChecked(True)
+        self.dialog.pointCheckX.setChecked(True)
+        self.assertFalse(self.dialog.pointCheck.isChecked())
+        self.dialog.pointCheck.setChecked(True)
+        self.assertFalse(self.dialog.pointCheckX.isChecked())
+
+    def test_buttonWithoutAxesBuildsNothing(self):
+        nodes = dg.nodeCount()
+        with self.assertRaises(ValueError):
+            self.dialog.parentMat()
+        self.assertEqual(dg.nodeCount(), nodes)
+